@@ -10,8 +10,9 @@ import logging
 import datetime
 import uuid
 import base64
-import io
-from PIL import Image
+import hashlib
+import threading
+from collections import OrderedDict
 from typing import Dict, List, Any, Tuple
 import openai
 
@@ -43,6 +44,41 @@ headers = {
 #         ├── heatmaps/        # Complexity heatmaps
 #         └── comprehensive/   # Comprehensive analysis reports
 
+# Decoded uploads, keyed on a digest of the image bytes. The editor typically
+# sends the same screenshot to several endpoints (components, heatmap,
+# comprehensive) back to back, so warm instances skip the repeat decode.
+DECODED_IMAGE_CACHE_SIZE = 8
+_decoded_images: "OrderedDict[str, np.ndarray]" = OrderedDict()
+_decoded_images_lock = threading.Lock()
+
+
+def decode_image_base64(image_base64: str) -> np.ndarray:
+    """Decode a base64 (optionally data-URL) image straight to a BGR array"""
+    image_data = base64.b64decode(image_base64.split(',')[-1])
+    key = hashlib.blake2b(image_data, digest_size=16).hexdigest()
+    
+    with _decoded_images_lock:
+        image = _decoded_images.get(key)
+        if image is not None:
+            _decoded_images.move_to_end(key)
+            return image
+    
+    # Decode outside the lock so concurrent requests for other images don't wait;
+    # cv2.imdecode yields BGR directly, so no RGB -> BGR conversion is needed
+    image = cv2.imdecode(np.frombuffer(image_data, np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError("Could not decode image data")
+    # Shared between requests, so guard against in-place drawing
+    image.flags.writeable = False
+    
+    with _decoded_images_lock:
+        _decoded_images[key] = image
+        _decoded_images.move_to_end(key)
+        while len(_decoded_images) > DECODED_IMAGE_CACHE_SIZE:
+            _decoded_images.popitem(last=False)
+    return image
+
+
 # Component Detection Classes (Simplified versions from existing code)
 class ComponentMatch:
     def __init__(self, component_type: str, confidence: float, bbox: Tuple[int, int, int, int], 
@@ -434,9 +470,7 @@ def analyze_image(request):
         # Load image
         if image_base64:
             # Decode base64 image
-            image_data = base64.b64decode(image_base64.split(',')[-1])
-            image = Image.open(io.BytesIO(image_data))
-            image = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
+            image = decode_image_base64(image_base64)
         else:
             # Download from URL (implement if needed)
             return jsonify({"error": "URL loading not implemented yet"}), 400, headers
@@ -567,9 +601,7 @@ def detect_components_endpoint(request):
             return jsonify({"error": "projectId and imageBase64 are required"}), 400, headers
         
         # Decode image
-        image_data = base64.b64decode(image_base64.split(',')[-1])
-        image = Image.open(io.BytesIO(image_data))
-        image = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
+        image = decode_image_base64(image_base64)
         
         analyzer = AIVisionAnalyzer()
         components = analyzer.detect_ui_components(image)
@@ -619,9 +651,7 @@ def generate_heatmap_endpoint(request):
             return jsonify({"error": "projectId and imageBase64 are required"}), 400, headers
         
         # Decode image
-        image_data = base64.b64decode(image_base64.split(',')[-1])
-        image = Image.open(io.BytesIO(image_data))
-        image = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
+        image = decode_image_base64(image_base64)
         
         analyzer = AIVisionAnalyzer()
         heatmap, complexity_metrics = analyzer.generate_complexity_heatmap(image)
@@ -672,9 +702,7 @@ def comprehensive_analysis_endpoint(request):
             return jsonify({"error": "projectId and imageBase64 are required"}), 400, headers
         
         # Decode image
-        image_data = base64.b64decode(image_base64.split(',')[-1])
-        image = Image.open(io.BytesIO(image_data))
-        image = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
+        image = decode_image_base64(image_base64)
         
         analyzer = AIVisionAnalyzer()
         analysis_id = str(uuid.uuid4())
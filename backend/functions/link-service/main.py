@@ -8,6 +8,7 @@ import openai
 import os
 import json
 import logging
+import re
 from datetime import datetime, timedelta
 import hashlib
 import time
@@ -35,6 +36,9 @@ headers = {
     'Access-Control-Allow-Headers': 'Content-Type, Authorization',
 }
 
+# Phrase boundaries in scraped text: line breaks or runs of 2+ spaces, with surrounding whitespace
+PHRASE_BREAK = re.compile(r'\s*(?:[\r\n\v\f\x1c-\x1e\x85\u2028\u2029]|  )\s*')
+
 # Content type TTL policies (in hours)
 CONTENT_TYPE_TTL = {
     'api-docs': 2,
@@ -244,10 +248,8 @@ def fetch_link(link_id, request):
             # Get text content
             text_content = soup.get_text()
             
-            # Clean up text
-            lines = (line.strip() for line in text_content.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            clean_text = ' '.join(chunk for chunk in chunks if chunk)
+            # Clean up text: one regex pass instead of per-line and per-phrase Python loops
+            clean_text = ' '.join(filter(None, PHRASE_BREAK.split(text_content.strip())))
             
             # Limit content size (first 10000 characters)
             if len(clean_text) > 10000:
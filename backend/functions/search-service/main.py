@@ -3,6 +3,7 @@ import functions_framework
 import google.cloud.logging
 from google.cloud import firestore
 import numpy as np
+import base64
 import json
 import logging
 
@@ -38,6 +39,12 @@ def cosine_similarity(vec1, vec2):
     
     return dot_product / (norm1 * norm2)
 
+def get_query_embedding(data):
+    """Read the query embedding from a JSON list or a base64 float32 buffer ('embedding_b64')."""
+    if data.get('embedding_b64'):
+        return np.frombuffer(base64.b64decode(data['embedding_b64']), dtype=np.float32)
+    return data.get('embedding') or None
+
 @functions_framework.http
 def semantic_search(request):
     """Entry point for the snapit search service Google Cloud Function."""
@@ -93,13 +100,13 @@ def perform_semantic_search(request):
         return jsonify({"error": "No data provided"}), 400, headers
 
     try:
-        query_embedding = data.get('embedding')
+        query_embedding = get_query_embedding(data)
         project_id = data.get('projectId')
         threshold = data.get('threshold', 0.7)
         limit = data.get('limit', 10)
         search_type = data.get('type', 'all')  # 'assets', 'components', 'all'
         
-        if not query_embedding or not project_id:
+        if query_embedding is None or not project_id:
             return jsonify({'error': 'Missing embedding or projectId'}), 400, headers
         
         results = []
@@ -659,7 +666,7 @@ def search_documents(request):
     try:
         project_id = data.get('projectId')
         query = data.get('query', '')
-        query_embedding = data.get('embedding')  # Pre-computed embedding for the query
+        query_embedding = get_query_embedding(data)  # Pre-computed embedding for the query
         search_type = data.get('searchType', 'semantic')  # 'semantic', 'keyword', 'summary'
         filters = data.get('filters', {})
         threshold = data.get('threshold', 0.7)
@@ -671,7 +678,7 @@ def search_documents(request):
         results = []
         
         # Search in document embeddings collection for RAG
-        if search_type in ['semantic', 'all'] and query_embedding:
+        if search_type in ['semantic', 'all'] and query_embedding is not None:
             embeddings_ref = db.collection('projects').document(project_id).collection('embeddings')
             embeddings_docs = embeddings_ref.where('sourceType', '==', 'document').stream()
             
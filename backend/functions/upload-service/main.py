@@ -6,6 +6,7 @@ import logging
 import uuid
 import datetime
 import json
+import os
 
 # Set up Google Cloud Logging
 client = google.cloud.logging.Client()
@@ -21,6 +22,9 @@ db = firestore.Client(database="snapit")
 # Initialize Cloud Storage client
 storage_client = storage.Client()
 
+# Large uploads are streamed to GCS in chunks of this size (must be a multiple of 256 KiB)
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
 # CORS headers
 headers = {
     'Access-Control-Allow-Origin': '*',
@@ -116,9 +120,15 @@ def add_file(request):
     bucket_name = f"snapit-{project_id}"
     bucket = storage_client.bucket(bucket_name)
 
-    # Upload to GCS
-    blob = bucket.blob(storage_path)
-    blob.upload_from_string(upload_file.read(), content_type=upload_file.content_type)
+    # Upload to GCS straight from the request stream: small files go up in one
+    # request, larger ones in chunks instead of being read into memory whole
+    upload_stream = upload_file.stream
+    upload_stream.seek(0, os.SEEK_END)
+    upload_size = upload_stream.tell()
+    upload_stream.seek(0)
+
+    blob = bucket.blob(storage_path, chunk_size=UPLOAD_CHUNK_SIZE)
+    blob.upload_from_file(upload_stream, size=upload_size, content_type=upload_file.content_type)
 
     # Make file publicly accessible
     blob.make_public()
@@ -7,14 +7,19 @@ import json
 import os
 import asyncio
 import shutil
+import sqlite3
+import stat
+import tempfile
 import time
+import zipfile
 from typing import List, Optional, Dict, Any
 from pathlib import Path
 
 from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-import aiofiles
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from pydantic import BaseModel, ConfigDict
 from dotenv import load_dotenv
 import subprocess
 
@@ -42,6 +47,55 @@ GEMINI_CLI_PATH = os.getenv(
 )
 PROJECTS_ROOT = Path("./generated_projects")
 PROJECTS_ROOT.mkdir(exist_ok=True)
+PROJECT_STATUS_DB = Path(
+    os.getenv("PROJECT_STATUS_DB", str(PROJECTS_ROOT / ".project_status.db"))
+)
+
+# Project archive settings: generated sources are small text files, so the
+# fastest deflate level gives near-identical ratios; already-compressed assets
+# are stored as-is and installed dependencies are left out entirely
+ZIP_STORED_SUFFIXES = {".png", ".jpg", ".jpeg", ".gif", ".webp", ".ico", ".woff", ".woff2", ".zip", ".gz"}
+ZIP_EXCLUDED_DIRS = {"node_modules", ".angular"}
+
+# Generation prompt, flattened to a single line once at import time
+GEMINI_PROMPT_TEMPLATE = """
+    \"Create a complete Angular 20 project named '{project_name}-angular20' based on the following context and requirements:
+
+    CONTEXT path:
+    @C:/Users/subha/Desktop/MCP-POC/snapit/{context_content}
+
+    PROJECT REQUIREMENTS:
+    - Project name: {project_name}-angular20
+    - Framework: Angular 20 
+    - Use TypeScript with strict mode
+    - Implement all UI components as described in the context
+    - Follow Angular best practices and style guide
+    - Use Angular Material for UI components
+    - Implement responsive design
+    - Include proper error handling
+    - Set up routing and navigation
+    - Create services for data management
+    - Include unit test files
+    - Implement dark/light theme support
+    - Follow accessibility guidelines (WCAG 2.1 AA)
+
+    IMPORTANT INSTRUCTIONS:
+    1. Generate ONLY the Angular project files and structure
+    2. Create a complete package.json with all necessary dependencies
+    3. Include angular.json configuration
+    4. Create all component files (.ts, .html, .css)
+    5. Create service files and modules
+    6. Include proper TypeScript configurations
+    7. Set up environment files
+    8. Create a comprehensive README.md with setup instructions
+    9. Ensure all imports and dependencies are correctly specified
+    10. Make the project ready to build and run with 'ng serve'
+
+    OUTPUT FORMAT:
+    Provide a complete project structure with file contents. Each file should be clearly separated and named.
+    Start with a project structure overview, then provide the content for each file.
+     \" 
+     """.replace("\n", " ").strip()
 
 
 # Pydantic models
@@ -65,6 +119,9 @@ class ProjectResponse(BaseModel):
 
 
 class ProjectStatus(BaseModel):
+    # Snapshots are replaced wholesale in the store, never edited in place
+    model_config = ConfigDict(frozen=True)
+
     project_id: str
     status: str
     current_step: str
@@ -73,8 +130,84 @@ class ProjectStatus(BaseModel):
     errors: List[str] = []
 
 
+class ProjectStatusStore:
+    """SQLite-backed project status store shared by every server worker"""
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self._execute("PRAGMA journal_mode=WAL")
+        self._execute(
+            """
+            CREATE TABLE IF NOT EXISTS project_status (
+                project_id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                current_step TEXT NOT NULL,
+                progress INTEGER NOT NULL,
+                logs TEXT NOT NULL,
+                errors TEXT NOT NULL
+            )
+            """
+        )
+
+    def _execute(self, sql: str, params: tuple = ()) -> Optional[tuple]:
+        # A short-lived connection per call keeps the store safe to use from
+        # worker threads; WAL mode lets readers proceed during writes
+        conn = sqlite3.connect(self.db_path, timeout=5)
+        try:
+            with conn:
+                return conn.execute(sql, params).fetchone()
+        finally:
+            conn.close()
+
+    def get(self, project_id: str) -> Optional[ProjectStatus]:
+        row = self._execute(
+            "SELECT status, current_step, progress, logs, errors "
+            "FROM project_status WHERE project_id = ?",
+            (project_id,),
+        )
+        if row is None:
+            return None
+
+        # Rows were validated on the way in, so skip re-validating them on every poll
+        status, current_step, progress, logs, errors = row
+        return ProjectStatus.model_construct(
+            project_id=project_id,
+            status=status,
+            current_step=current_step,
+            progress=progress,
+            logs=json.loads(logs),
+            errors=json.loads(errors),
+        )
+
+    def set(self, project_status: ProjectStatus):
+        self._execute(
+            "INSERT OR REPLACE INTO project_status "
+            "(project_id, status, current_step, progress, logs, errors) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                project_status.project_id,
+                project_status.status,
+                project_status.current_step,
+                project_status.progress,
+                json.dumps(project_status.logs),
+                json.dumps(project_status.errors),
+            ),
+        )
+
+
 # Global status tracking
-project_status_cache = {}
+project_status_store = ProjectStatusStore(PROJECT_STATUS_DB)
+
+# Status streams wake up as soon as this worker writes an update; updates written
+# by other workers are picked up by re-reading the store at least this often
+STATUS_STREAM_REFRESH = 2.0
+STATUS_FINAL_STATES = {"completed", "failed"}
+_status_changed = asyncio.Condition()
+
+# Health and prerequisite checks probe the toolchain through subprocesses, so the
+# result is reused for a short window instead of spawning four processes per request
+HEALTH_CACHE_TTL = 1.0
+_health_tools_cache: Dict[str, Any] = {"checked_at": 0.0, "tools": None}
 
 
 async def run_command(
@@ -118,47 +251,67 @@ async def run_command(
 
 async def check_prerequisites() -> Dict[str, bool]:
     """Check if all required tools are available"""
-    tools = {}
-
-    # Check Gemini CLI
-    result = await run_command([GEMINI_CLI_PATH, "--version"])
-    tools["gemini"] = result["success"]
+    commands = {
+        "gemini": [GEMINI_CLI_PATH, "--version"],
+        "node": ["node", "--version"],
+        "npm": ["npm", "--version"],
+        "angular_cli": ["ng", "version"],
+    }
 
-    # Check Node.js
-    result = await run_command(["node", "--version"])
-    tools["node"] = result["success"]
+    # The probes are independent subprocesses, so run them concurrently
+    results = await asyncio.gather(*(run_command(cmd) for cmd in commands.values()))
 
-    # Check npm
-    result = await run_command(["npm", "--version"])
-    tools["npm"] = result["success"]
+    return {tool: result["success"] for tool, result in zip(commands, results)}
 
-    # Check Angular CLI
-    result = await run_command(["ng", "version"])
-    tools["angular_cli"] = result["success"]
 
+async def get_cached_prerequisites() -> Dict[str, bool]:
+    """Return prerequisite results, re-probing at most once per HEALTH_CACHE_TTL"""
+    now = time.monotonic()
+    tools = _health_tools_cache["tools"]
+    if tools is None or now - _health_tools_cache["checked_at"] >= HEALTH_CACHE_TTL:
+        tools = await check_prerequisites()
+        _health_tools_cache["tools"] = tools
+        _health_tools_cache["checked_at"] = now
     return tools
 
 
+async def read_text_file(path: Path) -> str:
+    """Read a small text file with a single hop to the thread pool"""
+    return await asyncio.to_thread(path.read_text, encoding="utf-8")
+
+
+async def write_text_file(path: Path, content: str):
+    """Write a small text file with a single hop to the thread pool"""
+    await asyncio.to_thread(path.write_text, content, encoding="utf-8")
+
+
 async def read_context_files(context_path: str) -> str:
     """Read and combine context files"""
     context_content = ""
     context_dir = Path(context_path)
 
-    if not context_dir.exists():
+    # Single stat call instead of exists() followed by is_file()
+    try:
+        context_mode = context_dir.stat().st_mode
+    except FileNotFoundError:
         return "No context files found."
 
-    if context_dir.is_file():
+    if stat.S_ISREG(context_mode):
         # Single file
-        async with aiofiles.open(context_dir, "r", encoding="utf-8") as f:
-            content = await f.read()
-            context_content = f"--- {context_dir.name} ---\n{content}\n"
+        content = await read_text_file(context_dir)
+        context_content = f"--- {context_dir.name} ---\n{content}\n"
     else:
-        # Directory with multiple files
-        for file_path in context_dir.glob("*"):
-            if file_path.is_file() and file_path.suffix in [".txt", ".md", ".json"]:
-                async with aiofiles.open(file_path, "r", encoding="utf-8") as f:
-                    content = await f.read()
-                    context_content += f"\n--- {file_path.name} ---\n{content}\n"
+        # Directory with multiple files, read concurrently and joined once
+        file_paths = [
+            file_path
+            for file_path in context_dir.glob("*")
+            if file_path.suffix in (".txt", ".md", ".json") and file_path.is_file()
+        ]
+        contents = await asyncio.gather(*(read_text_file(p) for p in file_paths))
+        context_content = "".join(
+            f"\n--- {file_path.name} ---\n{content}\n"
+            for file_path, content in zip(file_paths, contents)
+        )
 
     return context_content
 
@@ -168,44 +321,9 @@ async def generate_project_with_gemini(
 ) -> Dict[str, Any]:
     """Use Gemini CLI to generate Angular 20 project"""
 
-    prompt = f"""
-    \"Create a complete Angular 20 project named '{project_name}-angular20' based on the following context and requirements:
-
-    CONTEXT path:
-    @C:/Users/subha/Desktop/MCP-POC/snapit/{context_content}
-
-    PROJECT REQUIREMENTS:
-    - Project name: {project_name}-angular20
-    - Framework: Angular 20 
-    - Use TypeScript with strict mode
-    - Implement all UI components as described in the context
-    - Follow Angular best practices and style guide
-    - Use Angular Material for UI components
-    - Implement responsive design
-    - Include proper error handling
-    - Set up routing and navigation
-    - Create services for data management
-    - Include unit test files
-    - Implement dark/light theme support
-    - Follow accessibility guidelines (WCAG 2.1 AA)
-
-    IMPORTANT INSTRUCTIONS:
-    1. Generate ONLY the Angular project files and structure
-    2. Create a complete package.json with all necessary dependencies
-    3. Include angular.json configuration
-    4. Create all component files (.ts, .html, .css)
-    5. Create service files and modules
-    6. Include proper TypeScript configurations
-    7. Set up environment files
-    8. Create a comprehensive README.md with setup instructions
-    9. Ensure all imports and dependencies are correctly specified
-    10. Make the project ready to build and run with 'ng serve'
-
-    OUTPUT FORMAT:
-    Provide a complete project structure with file contents. Each file should be clearly separated and named.
-    Start with a project structure overview, then provide the content for each file.
-     \" 
-     """.replace("\n", " ").strip()
+    prompt = GEMINI_PROMPT_TEMPLATE.format(
+        project_name=project_name, context_content=context_content
+    )
 
     # Create project directory
     print(f"📁 Creating project directory: {project_path}")
@@ -282,19 +400,20 @@ async def fix_common_issues(
         if "Strict mode" in error_output or "strictTemplates" in error_output:
             # Adjust TypeScript strict settings
             tsconfig_path = project_path / "tsconfig.json"
-            if tsconfig_path.exists():
+            try:
                 # Read and modify tsconfig
-                async with aiofiles.open(tsconfig_path, "r") as f:
-                    content = await f.read()
+                content = await read_text_file(tsconfig_path)
+            except FileNotFoundError:
+                content = None
 
+            if content is not None:
                 # Make strict mode less restrictive for auto-generated code
                 content = content.replace('"strict": true', '"strict": false')
                 content = content.replace(
                     '"strictTemplates": true', '"strictTemplates": false'
                 )
 
-                async with aiofiles.open(tsconfig_path, "w") as f:
-                    await f.write(content)
+                await write_text_file(tsconfig_path, content)
 
                 fixes_applied.append("Relaxed TypeScript strict mode settings")
 
@@ -310,6 +429,93 @@ async def fix_common_issues(
     return fixes_applied
 
 
+def resolve_project_path(project_name: str) -> Path:
+    """Map a project name from a URL to its directory, or raise 404 if it could escape PROJECTS_ROOT"""
+    project_path = (PROJECTS_ROOT / project_name).resolve()
+    if project_name.startswith(".") or project_path.parent != PROJECTS_ROOT.resolve():
+        raise HTTPException(status_code=404, detail="Project not found")
+    return project_path
+
+
+def create_project_zip(project_path: Path) -> Path:
+    """Archive a generated project for download, skipping installed dependencies"""
+    zip_path = PROJECTS_ROOT / f"{project_path.name}.zip"
+
+    file_paths = []
+    latest_mtime = 0.0
+    for root, dirs, files in os.walk(project_path):
+        dirs[:] = [d for d in dirs if d not in ZIP_EXCLUDED_DIRS]
+        latest_mtime = max(latest_mtime, os.stat(root).st_mtime)
+        for file_name in files:
+            file_path = Path(root) / file_name
+            latest_mtime = max(latest_mtime, file_path.stat().st_mtime)
+            file_paths.append(file_path)
+
+    # The archive is stamped with the newest mtime it covers, so an unchanged
+    # project is served from the previous archive without recompressing
+    try:
+        if zip_path.stat().st_mtime >= latest_mtime:
+            return zip_path
+    except FileNotFoundError:
+        pass
+
+    # Build next to the final path and swap it in, so downloads in flight
+    # never see a half-written archive
+    fd, tmp_name = tempfile.mkstemp(dir=PROJECTS_ROOT, suffix=".zip.tmp")
+    os.close(fd)
+    try:
+        with zipfile.ZipFile(
+            tmp_name, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=1
+        ) as zipf:
+            for file_path in file_paths:
+                compress_type = (
+                    zipfile.ZIP_STORED
+                    if file_path.suffix.lower() in ZIP_STORED_SUFFIXES
+                    else None
+                )
+                zipf.write(
+                    file_path,
+                    file_path.relative_to(project_path),
+                    compress_type=compress_type,
+                )
+        os.utime(tmp_name, (latest_mtime, latest_mtime))
+        os.replace(tmp_name, zip_path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+
+    return zip_path
+
+
+def scan_projects() -> List[Dict[str, Any]]:
+    """Collect generated project metadata in a single directory scan"""
+    projects = []
+
+    try:
+        entries = os.scandir(PROJECTS_ROOT)
+    except FileNotFoundError:
+        return projects
+
+    with entries:
+        # DirEntry caches the file type from the directory listing, so only
+        # the ctime lookup and the two marker checks touch the filesystem
+        for entry in entries:
+            if entry.is_dir():
+                projects.append(
+                    {
+                        "name": entry.name,
+                        "path": entry.path,
+                        "created": entry.stat().st_ctime,
+                        "has_build": os.path.exists(os.path.join(entry.path, "dist")),
+                        "has_node_modules": os.path.exists(
+                            os.path.join(entry.path, "node_modules")
+                        ),
+                    }
+                )
+
+    return projects
+
+
 async def update_project_status(
     project_id: str,
     status: str,
@@ -318,8 +524,8 @@ async def update_project_status(
     logs: List[str] = None,
     errors: List[str] = None,
 ):
-    """Update project status in cache"""
-    project_status_cache[project_id] = ProjectStatus(
+    """Update project status in the shared store"""
+    project_status = ProjectStatus(
         project_id=project_id,
         status=status,
         current_step=step,
@@ -327,6 +533,9 @@ async def update_project_status(
         logs=logs or [],
         errors=errors or [],
     )
+    await asyncio.to_thread(project_status_store.set, project_status)
+    async with _status_changed:
+        _status_changed.notify_all()
 
 
 async def process_project_generation(project_request: ProjectRequest, project_id: str):
@@ -415,11 +624,6 @@ async def process_project_generation(project_request: ProjectRequest, project_id
             project_id, "completed", "Project ready", 100, logs, errors
         )
 
-        # Update final status with results
-        final_status = project_status_cache[project_id]
-        final_status.logs = logs
-        final_status.errors = errors
-
     except Exception as e:
         errors.append(f"Unexpected error: {str(e)}")
         await update_project_status(
@@ -430,30 +634,40 @@ async def process_project_generation(project_request: ProjectRequest, project_id
 # API Endpoints
 
 
-@app.get("/")
-async def root():
-    """Root endpoint with API information"""
-    return {
+# The API description never changes, so serialize it once instead of running it
+# through FastAPI's encoder on every request
+ROOT_RESPONSE_BODY = json.dumps(
+    {
         "message": "SnapIt Code Agent - Enhanced",
         "version": "2.0.0",
         "description": "Enhanced AI-powered code agent for Angular 20 project generation, building, and running",
         "endpoints": {
             "generate": "/generate - Generate, build, and run Angular project",
             "status": "/status/{project_id} - Check project generation status",
+            "events": "/status/{project_id}/events - Stream status changes (SSE)",
             "projects": "/projects - List all projects",
+            "download": "/projects/{project_name}/download - Download project as ZIP",
             "prerequisites": "/prerequisites - Check system prerequisites",
         },
     }
+).encode("utf-8")
+
+
+@app.get("/")
+async def root():
+    """Root endpoint with API information"""
+    return Response(content=ROOT_RESPONSE_BODY, media_type="application/json")
 
 
 @app.get("/prerequisites")
 async def check_system_prerequisites():
     """Check if all required tools are available"""
-    tools = await check_prerequisites()
+    tools = await get_cached_prerequisites()
+    missing = [tool for tool, available in tools.items() if not available]
     return {
         "tools": tools,
-        "all_available": all(tools.values()),
-        "missing": [tool for tool, available in tools.items() if not available],
+        "all_available": not missing,
+        "missing": missing,
     }
 
 
@@ -495,49 +709,89 @@ async def generate_project(
 async def get_project_status(project_id: str):
     """Get project generation status"""
 
-    if project_id not in project_status_cache:
+    project_status = await asyncio.to_thread(project_status_store.get, project_id)
+    if project_status is None:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    return project_status_cache[project_id]
+    return project_status
+
+
+@app.get("/status/{project_id}/events")
+async def stream_project_status(project_id: str):
+    """Stream project status changes as server-sent events"""
+
+    if await asyncio.to_thread(project_status_store.get, project_id) is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    async def events():
+        last_payload = None
+        while True:
+            project_status = await asyncio.to_thread(
+                project_status_store.get, project_id
+            )
+            if project_status is None:
+                return
+
+            payload = json.dumps(jsonable_encoder(project_status))
+            if payload != last_payload:
+                yield f"data: {payload}\n\n"
+                last_payload = payload
+            else:
+                # Comment line keeps proxies from closing an idle stream
+                yield ": keep-alive\n\n"
+
+            if project_status.status in STATUS_FINAL_STATES:
+                return
+
+            try:
+                async with _status_changed:
+                    await asyncio.wait_for(
+                        _status_changed.wait(), timeout=STATUS_STREAM_REFRESH
+                    )
+            except asyncio.TimeoutError:
+                pass
+
+    return StreamingResponse(events(), media_type="text/event-stream")
 
 
 @app.get("/projects")
 async def list_projects():
     """List all generated projects"""
-    projects = []
+    projects = await asyncio.to_thread(scan_projects)
+    return {"projects": projects}
 
-    if PROJECTS_ROOT.exists():
-        for project_dir in PROJECTS_ROOT.iterdir():
-            if project_dir.is_dir():
-                projects.append(
-                    {
-                        "name": project_dir.name,
-                        "path": str(project_dir),
-                        "created": project_dir.stat().st_ctime,
-                        "has_build": (project_dir / "dist").exists(),
-                        "has_node_modules": (project_dir / "node_modules").exists(),
-                    }
-                )
 
-    return {"projects": projects}
+@app.get("/projects/{project_name}/download")
+async def download_project(project_name: str):
+    """Download a generated project as a ZIP archive"""
+    project_path = resolve_project_path(project_name)
+
+    if not project_path.is_dir():
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    # Compression is CPU-bound, keep it off the event loop
+    zip_path = await asyncio.to_thread(create_project_zip, project_path)
+    return FileResponse(zip_path, media_type="application/zip", filename=zip_path.name)
 
 
 @app.delete("/projects/{project_name}")
 async def delete_project(project_name: str):
     """Delete a generated project"""
-    project_path = PROJECTS_ROOT / project_name
+    project_path = resolve_project_path(project_name)
 
-    if not project_path.exists():
+    try:
+        shutil.rmtree(project_path)
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    shutil.rmtree(project_path)
+    (PROJECTS_ROOT / f"{project_name}.zip").unlink(missing_ok=True)
     return {"message": f"Project '{project_name}' deleted successfully"}
 
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    tools = await check_prerequisites()
+    tools = await get_cached_prerequisites()
     return {
         "status": "healthy" if all(tools.values()) else "warning",
         "timestamp": int(time.time()),
@@ -7,17 +7,51 @@ import requests
 import json
 import time
 import os
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 API_BASE_URL = "http://localhost:8001"
 
+# Shared session so status polling reuses one keep-alive connection
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
+# Status polling backs off from the min to the max interval while nothing changes
+POLL_MIN_INTERVAL = 1.0
+POLL_MAX_INTERVAL = 5.0
+
+
+# Health checks fail fast when the agent is down: a short connect timeout, a read
+# timeout that still covers a cold toolchain probe, and exponential backoff so
+# repeated checks against a dead server skip the socket entirely
+HEALTH_TIMEOUT = (0.5, 5.0)
+HEALTH_BACKOFF_MIN = 1.0
+HEALTH_BACKOFF_MAX = 30.0
+_health_failure = {"failed_at": 0.0, "backoff": 0.0}
+
+
+def parse_json(body):
+    """Decode a JSON response or event payload, with orjson when it is installed"""
+    if isinstance(body, requests.Response):
+        body = body.content
+    if ORJSON_AVAILABLE:
+        return orjson.loads(body)
+    return json.loads(body)
+
 
 def test_prerequisites():
     """Test prerequisites check"""
     print("🔍 Checking system prerequisites...")
     try:
-        response = requests.get(f"{API_BASE_URL}/prerequisites")
+        response = SESSION.get(f"{API_BASE_URL}/prerequisites")
         if response.status_code == 200:
-            data = response.json()
+            data = parse_json(response)
             print("✅ Prerequisites check completed")
             print(f"   All tools available: {data['all_available']}")
             for tool, available in data["tools"].items():
@@ -54,10 +88,10 @@ def generate_project(
     }
 
     try:
-        response = requests.post(f"{API_BASE_URL}/generate", json=project_data)
+        response = SESSION.post(f"{API_BASE_URL}/generate", json=project_data)
 
         if response.status_code == 200:
-            result = response.json()
+            result = parse_json(response)
             print("✅ Project generation started")
             print(f"   Project ID: {result['project_id']}")
             print(f"   Status: {result['status']}")
@@ -75,9 +109,9 @@ def generate_project(
 def check_project_status(project_id: str):
     """Check project generation status"""
     try:
-        response = requests.get(f"{API_BASE_URL}/status/{project_id}")
+        response = SESSION.get(f"{API_BASE_URL}/status/{project_id}")
         if response.status_code == 200:
-            status = response.json()
+            status = parse_json(response)
             return status
         else:
             print(f"❌ Status check failed: {response.status_code}")
@@ -87,11 +121,72 @@ def check_project_status(project_id: str):
         return None
 
 
+def stream_project_status(project_id: str, timeout: float):
+    """Yield status updates pushed by the server over server-sent events
+
+    Keep-alive comments yield None so callers can still enforce their deadline.
+    """
+    with SESSION.get(
+        f"{API_BASE_URL}/status/{project_id}/events",
+        stream=True,
+        timeout=(5, timeout),
+        headers={"Accept": "text/event-stream"},
+    ) as response:
+        response.raise_for_status()
+        for line in response.iter_lines(decode_unicode=True):
+            if line.startswith("data: "):
+                yield parse_json(line[len("data: ") :])
+            elif line.startswith(":"):
+                yield None
+
+
+def print_project_status(status: dict):
+    """Print one status update"""
+    print(
+        f"   Status: {status['status']} | Step: {status['current_step']} | Progress: {status['progress']}%"
+    )
+
+    if status["logs"]:
+        for log in status["logs"][-3:]:  # Show last 3 logs
+            print(f"   📝 {log}")
+
+    if status["errors"]:
+        for error in status["errors"]:
+            print(f"   ❌ {error}")
+
+
+def print_final_status(status: dict):
+    """Print the outcome of a finished generation"""
+    print(f"\n🎯 Final Status: {status['status']}")
+    if status["status"] == "completed":
+        print("✅ Project generation completed successfully!")
+    else:
+        print("❌ Project generation failed!")
+
+
 def monitor_project_generation(project_id: str, max_wait_time: int = 600):
     """Monitor project generation progress"""
     print(f"📊 Monitoring project generation: {project_id}")
 
     start_time = time.time()
+    status = None
+
+    # Prefer the event stream: updates arrive as soon as the server writes them
+    try:
+        for update in stream_project_status(project_id, timeout=max_wait_time):
+            if update is not None:
+                status = update
+                print_project_status(status)
+                if status["status"] in ["completed", "failed"]:
+                    print_final_status(status)
+                    return status
+            if time.time() - start_time >= max_wait_time:
+                return status
+    except requests.RequestException as e:
+        print(f"   ⚠️ Status stream unavailable ({e}), falling back to polling")
+
+    poll_interval = POLL_MIN_INTERVAL
+    last_progress = None
 
     while time.time() - start_time < max_wait_time:
         status = check_project_status(project_id)
@@ -99,27 +194,22 @@ def monitor_project_generation(project_id: str, max_wait_time: int = 600):
         if not status:
             break
 
-        print(
-            f"   Status: {status['status']} | Step: {status['current_step']} | Progress: {status['progress']}%"
-        )
-
-        if status["logs"]:
-            for log in status["logs"][-3:]:  # Show last 3 logs
-                print(f"   📝 {log}")
-
-        if status["errors"]:
-            for error in status["errors"]:
-                print(f"   ❌ {error}")
+        print_project_status(status)
 
         if status["status"] in ["completed", "failed"]:
-            print(f"\n🎯 Final Status: {status['status']}")
-            if status["status"] == "completed":
-                print("✅ Project generation completed successfully!")
-            else:
-                print("❌ Project generation failed!")
+            print_final_status(status)
             break
 
-        time.sleep(5)  # Wait 5 seconds before next check
+        # Poll quickly while the generation is moving, back off while it is idle
+        progress = (status["status"], status["current_step"], status["progress"])
+        if progress != last_progress:
+            poll_interval = POLL_MIN_INTERVAL
+        else:
+            poll_interval = min(poll_interval * 2, POLL_MAX_INTERVAL)
+        last_progress = progress
+
+        remaining = max_wait_time - (time.time() - start_time)
+        time.sleep(max(0.0, min(poll_interval, remaining)))
 
     return status
 
@@ -128,9 +218,9 @@ def list_projects():
     """List all generated projects"""
     print("📁 Listing all projects...")
     try:
-        response = requests.get(f"{API_BASE_URL}/projects")
+        response = SESSION.get(f"{API_BASE_URL}/projects")
         if response.status_code == 200:
-            data = response.json()
+            data = parse_json(response)
             projects = data["projects"]
             print(f"✅ Found {len(projects)} projects:")
             for project in projects:
@@ -153,13 +243,43 @@ def list_projects():
         return []
 
 
+def download_project(project_name: str, destination: str = None):
+    """Download a generated project as a ZIP archive, streaming it to disk"""
+    destination = destination or f"{project_name}.zip"
+    print(f"📦 Downloading project: {project_name}")
+    try:
+        with SESSION.get(
+            f"{API_BASE_URL}/projects/{project_name}/download", stream=True
+        ) as response:
+            if response.status_code != 200:
+                print(f"❌ Download failed: {response.status_code}")
+                return None
+
+            with open(destination, "wb") as f:
+                for chunk in response.iter_content(chunk_size=65536):
+                    f.write(chunk)
+
+        print(f"✅ Saved to {destination} ({os.path.getsize(destination)} bytes)")
+        return destination
+    except Exception as e:
+        print(f"❌ Download error: {e}")
+        return None
+
+
 def test_health():
     """Test API health"""
     print("💓 Checking API health...")
+
+    retry_in = _health_failure["failed_at"] + _health_failure["backoff"] - time.monotonic()
+    if retry_in > 0:
+        print(f"❌ API unreachable (next attempt in {retry_in:.1f}s)")
+        return False
+
     try:
-        response = requests.get(f"{API_BASE_URL}/health")
+        response = SESSION.get(f"{API_BASE_URL}/health", timeout=HEALTH_TIMEOUT)
+        _health_failure["backoff"] = 0.0
         if response.status_code == 200:
-            health = response.json()
+            health = parse_json(response)
             print(f"✅ API Health: {health['status']}")
             print(f"   Version: {health['version']}")
             print(f"   Timestamp: {time.ctime(health['timestamp'])}")
@@ -172,6 +292,13 @@ def test_health():
         else:
             print(f"❌ Health check failed: {response.status_code}")
             return False
+    except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+        _health_failure["failed_at"] = time.monotonic()
+        _health_failure["backoff"] = min(
+            max(_health_failure["backoff"] * 2, HEALTH_BACKOFF_MIN), HEALTH_BACKOFF_MAX
+        )
+        print(f"❌ Health check error: {e}")
+        return False
     except Exception as e:
         print(f"❌ Health check error: {e}")
         return False
@@ -242,7 +369,8 @@ def interactive_mode():
     print("  3. generate <project_name> [context_path] - Generate project")
     print("  4. status <project_id> - Check project status")
     print("  5. list - List all projects")
-    print("  6. demo - Run full demo")
+    print("  6. download <project_name> [zip_path] - Download project ZIP")
+    print("  7. demo - Run full demo")
     print("  q. quit")
     print()
 
@@ -270,6 +398,8 @@ def interactive_mode():
                     print(json.dumps(status, indent=2))
             elif command[0] == "list":
                 list_projects()
+            elif command[0] == "download" and len(command) > 1:
+                download_project(command[1], command[2] if len(command) > 2 else None)
             elif command[0] == "demo":
                 run_demo()
             else:
@@ -4,8 +4,18 @@ Simple test client for local cloud functions
 """
 
 import requests
+import base64
 import json
 import os
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 # Local service URLs
 UPLOAD_URL = "http://localhost:8080"
@@ -13,9 +23,31 @@ EMBEDDING_URL = "http://localhost:8081"
 DATA_URL = "http://localhost:8082"
 SEARCH_URL = "http://localhost:8083"
 
-def test_upload_service():
+# Dummy OpenAI-sized query embedding, encoded once as raw float32 bytes
+DUMMY_EMBEDDING_B64 = base64.b64encode(np.full(1536, 0.1, dtype=np.float32).tobytes()).decode("ascii")
+
+# Shared session so every call reuses pooled keep-alive connections
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=8, pool_maxsize=32))
+
+def post_json(url, payload):
+    """POST a JSON payload, encoding with orjson when it is installed"""
+    if ORJSON_AVAILABLE:
+        return SESSION.post(url, data=orjson.dumps(payload), headers={"Content-Type": "application/json"})
+    return SESSION.post(url, json=payload)
+
+def parse_json(response):
+    """Decode a JSON response body, with orjson when it is installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(response.content)
+    return response.json()
+
+# A dead port fails after this many seconds instead of hanging the run
+HEALTH_TIMEOUT = 2
+
+def test_upload_service(log=print):
     """Test the upload service"""
-    print("📤 Testing Upload Service...")
+    log("📤 Testing Upload Service...")
     
     # Create a test file
     test_content = b"This is a test file content"
@@ -23,17 +55,18 @@ def test_upload_service():
     data = {'projectId': 'test-project-123', 'metadata': '{"description": "test file"}'}
     
     try:
-        response = requests.post(UPLOAD_URL, files=files, data=data)
-        print(f"   Status: {response.status_code}")
-        print(f"   Response: {response.json()}")
-        return response.json()
+        response = SESSION.post(UPLOAD_URL, files=files, data=data)
+        log(f"   Status: {response.status_code}")
+        result = parse_json(response)
+        log(f"   Response: {result}")
+        return result
     except Exception as e:
-        print(f"   Error: {e}")
+        log(f"   Error: {e}")
         return None
 
-def test_embedding_service():
+def test_embedding_service(log=print):
     """Test the embedding service"""
-    print("🧠 Testing Embedding Service...")
+    log("🧠 Testing Embedding Service...")
     
     payload = {
         "content": "This is a test text for embedding generation",
@@ -42,22 +75,22 @@ def test_embedding_service():
     }
     
     try:
-        response = requests.post(EMBEDDING_URL, json=payload)
-        print(f"   Status: {response.status_code}")
-        result = response.json()
+        response = post_json(EMBEDDING_URL, payload)
+        log(f"   Status: {response.status_code}")
+        result = parse_json(response)
         if 'embeddings' in result:
-            print(f"   Embeddings length: {len(result['embeddings'])}")
-            print(f"   Model: {result.get('model')}")
+            log(f"   Embeddings length: {len(result['embeddings'])}")
+            log(f"   Model: {result.get('model')}")
         else:
-            print(f"   Response: {result}")
+            log(f"   Response: {result}")
         return result
     except Exception as e:
-        print(f"   Error: {e}")
+        log(f"   Error: {e}")
         return None
 
-def test_data_service():
+def test_data_service(log=print):
     """Test the data service"""
-    print("💾 Testing Data Service...")
+    log("💾 Testing Data Service...")
     
     # Test creating a project
     payload = {
@@ -67,40 +100,40 @@ def test_data_service():
     }
     
     try:
-        response = requests.post(DATA_URL, json=payload)
-        print(f"   Status: {response.status_code}")
-        print(f"   Response: {response.json()}")
-        return response.json()
+        response = post_json(DATA_URL, payload)
+        log(f"   Status: {response.status_code}")
+        result = parse_json(response)
+        log(f"   Response: {result}")
+        return result
     except Exception as e:
-        print(f"   Error: {e}")
+        log(f"   Error: {e}")
         return None
 
-def test_search_service():
+def test_search_service(log=print):
     """Test the search service"""
-    print("🔍 Testing Search Service...")
+    log("🔍 Testing Search Service...")
     
     # Use dummy embedding for testing
-    dummy_embedding = [0.1] * 1536  # OpenAI embedding size
-    
     payload = {
-        "embedding": dummy_embedding,
+        "embedding_b64": DUMMY_EMBEDDING_B64,
         "projectId": "test-project-123",
         "threshold": 0.5,
         "limit": 5
     }
     
     try:
-        response = requests.post(SEARCH_URL, json=payload)
-        print(f"   Status: {response.status_code}")
-        print(f"   Response: {response.json()}")
-        return response.json()
+        response = post_json(SEARCH_URL, payload)
+        log(f"   Status: {response.status_code}")
+        result = parse_json(response)
+        log(f"   Response: {result}")
+        return result
     except Exception as e:
-        print(f"   Error: {e}")
+        log(f"   Error: {e}")
         return None
 
-def test_health_checks():
+def test_health_checks(log=print):
     """Test health endpoints"""
-    print("🚦 Testing Health Checks...")
+    log("🚦 Testing Health Checks...")
     
     services = [
         ("Upload", UPLOAD_URL),
@@ -109,36 +142,45 @@ def test_health_checks():
         ("Search", SEARCH_URL)
     ]
     
-    for name, url in services:
+    def check(service):
+        name, url = service
         try:
-            response = requests.get(f"{url}/health")
+            response = SESSION.get(f"{url}/health", timeout=HEALTH_TIMEOUT)
             if response.status_code == 404:
-                print(f"   {name}: Service running (no health endpoint)")
-            else:
-                print(f"   {name}: {response.status_code} - {response.text[:50]}")
-        except requests.exceptions.ConnectionError:
-            print(f"   {name}: ❌ Not running")
+                return f"   {name}: Service running (no health endpoint)"
+            return f"   {name}: {response.status_code} - {response.text[:50]}"
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            return f"   {name}: ❌ Not running"
         except Exception as e:
-            print(f"   {name}: Error - {e}")
+            return f"   {name}: Error - {e}"
+    
+    # Probe all services concurrently, report in the original order
+    with ThreadPoolExecutor(max_workers=len(services)) as executor:
+        for line in executor.map(check, services):
+            log(line)
+
+def run_concurrently(tests):
+    """Run independent service tests in parallel, printing each test's output as one block"""
+    outputs = [[] for _ in tests]
+    with ThreadPoolExecutor(max_workers=len(tests)) as executor:
+        futures = [executor.submit(test, log=output.append) for test, output in zip(tests, outputs)]
+        results = [future.result() for future in futures]
+    
+    for output in outputs:
+        print("\n".join(output))
+        print()
+    return results
 
 if __name__ == "__main__":
     print("🧪 Starting Cloud Functions Local Test Suite\n")
     
-    # Check if services are running
-    test_health_checks()
-    print()
-    
-    # Test each service
-    test_upload_service()
-    print()
-    
-    test_embedding_service()
-    print()
-    
-    test_data_service()
-    print()
-    
-    test_search_service()
-    print()
+    # The services do not depend on each other, so check and test them all at once
+    run_concurrently([
+        test_health_checks,
+        test_upload_service,
+        test_embedding_service,
+        test_data_service,
+        test_search_service,
+    ])
     
     print("✅ Testing complete!")
@@ -4,9 +4,25 @@ Quick setup script to get AccuracyValidatorAgent testing ready
 
 import os
 import sys
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import subprocess
 
+# pip distribution name -> importable module name
+REQUIRED_PACKAGES = {
+    "opencv-python": "cv2",
+    "selenium": "selenium",
+    "scikit-image": "skimage",
+    "webdriver-manager": "webdriver_manager",
+    "numpy": "numpy",
+    "pillow": "PIL"
+}
+
+def is_available(module: str) -> bool:
+    """Check that a module can be imported without importing it"""
+    return importlib.util.find_spec(module) is not None
+
 def quick_setup():
     """Quick setup for testing"""
     print("🚀 Quick Setup for AccuracyValidatorAgent Testing")
@@ -18,32 +34,25 @@ def quick_setup():
     print(f"✅ Created directory: {test_images_dir}")
     
     # Check Python dependencies
-    required_packages = [
-        "opencv-python",
-        "selenium", 
-        "scikit-image",
-        "webdriver-manager",
-        "numpy",
-        "pillow"
-    ]
+    with ThreadPoolExecutor(max_workers=len(REQUIRED_PACKAGES)) as executor:
+        available = list(executor.map(is_available, REQUIRED_PACKAGES.values()))
     
     missing_packages = []
-    for package in required_packages:
-        try:
-            __import__(package.replace("-", "_"))
+    for package, found in zip(REQUIRED_PACKAGES, available):
+        if found:
             print(f"✅ {package} - available")
-        except ImportError:
+        else:
             missing_packages.append(package)
             print(f"❌ {package} - missing")
     
     if missing_packages:
         print(f"\n📦 Installing missing packages...")
-        for package in missing_packages:
-            try:
-                subprocess.check_call([sys.executable, "-m", "pip", "install", package])
-                print(f"✅ Installed {package}")
-            except subprocess.CalledProcessError as e:
-                print(f"❌ Failed to install {package}: {e}")
+        # One pip run resolves and downloads everything together
+        try:
+            subprocess.check_call([sys.executable, "-m", "pip", "install", *missing_packages])
+            print(f"✅ Installed {', '.join(missing_packages)}")
+        except subprocess.CalledProcessError as e:
+            print(f"❌ Failed to install {', '.join(missing_packages)}: {e}")
     
     # Create sample test guide
     guide_content = """# Quick Test Guide
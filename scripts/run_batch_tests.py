@@ -7,8 +7,49 @@ Modify this script to add your own test scenarios
 from test_accuracy_validator import test_accuracy_validator
 from src.agents.skadoosh_agents import AccuracyValidatorAgent, AgentContext
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import json
 
+# Cases are dominated by page loads and LLM round trips, so a few run at once
+BATCH_WORKERS = 4
+
+def run_test_case(i, test_case):
+    """Run one test case and return its output lines"""
+    lines = [
+        f"\n📋 Test Case {i}: {test_case['name']}",
+        f"   Image: {test_case['image']}",
+        f"   URL: {test_case['url']}",
+    ]
+    
+    image_path = Path(__file__).parent / "test_images" / test_case['image']
+    
+    if not image_path.exists():
+        lines.append(f"   ❌ Image not found: {image_path}")
+        return lines
+    
+    # Create context and run test
+    context = AgentContext(
+        project_name=f"Test Case {i}",
+        uploads={"screenshot": str(image_path)}
+    )
+    
+    validator = AccuracyValidatorAgent()
+    input_data = {"deployed_url": test_case['url']}
+    
+    try:
+        result = validator.execute(context, input_data)
+        
+        accuracy = result.get('visual_accuracy_score', 0)
+        passed = result.get('passes_accuracy_threshold', False)
+        
+        lines.append(f"   📊 Accuracy: {accuracy:.1%}")
+        lines.append(f"   ✅ Result: {'PASS' if passed else 'FAIL'}")
+        
+    except Exception as e:
+        lines.append(f"   ❌ Test failed: {str(e)}")
+    
+    return lines
+
 def run_batch_tests():
     """Run multiple test cases from configuration"""
     
@@ -29,37 +70,16 @@ def run_batch_tests():
     
     print(f"🧪 Running {len(test_cases)} test cases...")
     
-    for i, test_case in enumerate(test_cases, 1):
-        print(f"\n📋 Test Case {i}: {test_case['name']}")
-        print(f"   Image: {test_case['image']}")
-        print(f"   URL: {test_case['url']}")
-        
-        image_path = Path(__file__).parent / "test_images" / test_case['image']
-        
-        if not image_path.exists():
-            print(f"   ❌ Image not found: {image_path}")
-            continue
-        
-        # Create context and run test
-        context = AgentContext(
-            project_name=f"Test Case {i}",
-            uploads={"screenshot": str(image_path)}
-        )
-        
-        validator = AccuracyValidatorAgent()
-        input_data = {"deployed_url": test_case['url']}
-        
-        try:
-            result = validator.execute(context, input_data)
-            
-            accuracy = result.get('visual_accuracy_score', 0)
-            passed = result.get('passes_accuracy_threshold', False)
-            
-            print(f"   📊 Accuracy: {accuracy:.1%}")
-            print(f"   ✅ Result: {'PASS' if passed else 'FAIL'}")
-            
-        except Exception as e:
-            print(f"   ❌ Test failed: {str(e)}")
+    # Keep every distinct reference image decoded for the whole batch, so cases
+    # that share a screenshot skip the repeat decode
+    distinct_images = {test_case['image'] for test_case in test_cases}
+    AccuracyValidatorAgent.image_cache_size = max(AccuracyValidatorAgent.image_cache_size, len(distinct_images))
+    
+    # Each case's report is printed as one block when it finishes
+    with ThreadPoolExecutor(max_workers=min(BATCH_WORKERS, len(test_cases))) as executor:
+        futures = [executor.submit(run_test_case, i, test_case) for i, test_case in enumerate(test_cases, 1)]
+        for future in as_completed(futures):
+            print("\n".join(future.result()))
 
 if __name__ == "__main__":
     run_batch_tests()
@@ -3,12 +3,50 @@ Setup script for AccuracyValidatorAgent testing environment
 This script will help you get started with testing visual accuracy validation
 """
 
+import glob
+import importlib.metadata
+import json
 import os
+import re
 import sys
 from pathlib import Path
 import subprocess
 
-def install_dependencies():
+try:
+    from packaging.requirements import Requirement
+    PACKAGING_AVAILABLE = True
+except ImportError:
+    PACKAGING_AVAILABLE = False
+
+PIP_INSTALL = [sys.executable, "-m", "pip", "install", "--disable-pip-version-check", "--no-input"]
+
+def is_satisfied(requirement):
+    """Check an installed distribution against a requirement string without running pip"""
+    if PACKAGING_AVAILABLE:
+        req = Requirement(requirement)
+        name, specifier = req.name, req.specifier
+    else:
+        name, specifier = re.match(r"[A-Za-z0-9._-]+", requirement).group(0), None
+    
+    try:
+        installed_version = importlib.metadata.version(name)
+    except importlib.metadata.PackageNotFoundError:
+        return False
+    
+    # Without packaging, presence is the best we can check
+    return specifier is None or specifier.contains(installed_version, prereleases=True)
+
+def install_package(package):
+    """pip install one package and report the outcome; returns whether it succeeded"""
+    result = subprocess.run(PIP_INSTALL + [package], capture_output=True, text=True)
+    if result.returncode != 0:
+        output = (result.stderr.strip() or result.stdout.strip()).splitlines()
+        print(f"   ❌ Failed to install {package}: {output[-1] if output else f'pip exited with {result.returncode}'}")
+        return False
+    print(f"   ✅ Installed {package}")
+    return True
+
+def install_dependencies(only_if_missing=True):
     """Install required Python packages"""
     print("📦 Installing dependencies...")
     
@@ -23,17 +61,62 @@ def install_dependencies():
         "pyyaml>=6.0"
     ]
     
-    for package in packages:
-        try:
-            print(f"   Installing {package}...")
-            subprocess.check_call([sys.executable, "-m", "pip", "install", package])
-        except subprocess.CalledProcessError as e:
-            print(f"   ❌ Failed to install {package}: {e}")
+    if only_if_missing:
+        packages = [package for package in packages if not is_satisfied(package)]
+        if not packages:
+            print("✅ All dependencies already installed")
+            return True
+    
+    # One pip run resolves and downloads the whole set at once
+    try:
+        print(f"   Installing {len(packages)} packages...")
+        subprocess.check_call(PIP_INSTALL + packages)
+    except subprocess.CalledProcessError:
+        # Retry per package only to find out which one is the problem; one at a
+        # time, since concurrent pip runs would race on shared dependencies like numpy
+        print("   ⚠️ Batch install failed, retrying packages individually...")
+        if not all([install_package(package) for package in packages]):
             return False
     
     print("✅ All dependencies installed successfully!")
     return True
 
+CHROME_BINARIES = ["google-chrome", "google-chrome-stable", "chromium", "chromium-browser"]
+WDM_DRIVERS_DIR = Path.home() / ".wdm" / "drivers" / "chromedriver"
+
+def detect_chrome_version():
+    """Installed Chrome version string, or None if it can't be determined"""
+    if sys.platform == "win32":
+        commands = [["reg", "query", r"HKEY_CURRENT_USER\Software\Google\Chrome\BLBeacon", "/v", "version"]]
+    else:
+        commands = [[binary, "--version"] for binary in CHROME_BINARIES]
+    
+    for command in commands:
+        try:
+            output = subprocess.run(command, capture_output=True, text=True, timeout=5).stdout
+        except (OSError, subprocess.SubprocessError):
+            continue
+        match = re.search(r"\d+\.\d+\.\d+\.\d+", output)
+        if match:
+            return match.group(0)
+    return None
+
+def find_chrome_driver():
+    """Path to a chromedriver for the installed Chrome, downloading one only if none is on disk"""
+    from webdriver_manager.chrome import ChromeDriverManager
+    
+    version = detect_chrome_version()
+    
+    # webdriver-manager stores drivers under <platform>/<version>/, so a file
+    # check avoids its version lookup round trip on every run
+    driver_name = "chromedriver.exe" if sys.platform == "win32" else "chromedriver"
+    if version:
+        for path in glob.glob(str(WDM_DRIVERS_DIR / "*" / version / "**" / driver_name), recursive=True):
+            if os.path.isfile(path):
+                return path
+    
+    return ChromeDriverManager().install()
+
 def setup_chrome_driver():
     """Setup Chrome WebDriver for Selenium"""
     print("🌐 Setting up Chrome WebDriver...")
@@ -41,7 +124,6 @@ def setup_chrome_driver():
     try:
         from selenium import webdriver
         from selenium.webdriver.chrome.options import Options
-        from webdriver_manager.chrome import ChromeDriverManager
         from selenium.webdriver.chrome.service import Service
         
         # Test Chrome driver installation
@@ -50,7 +132,7 @@ def setup_chrome_driver():
         chrome_options.add_argument("--no-sandbox")
         chrome_options.add_argument("--disable-dev-shm-usage")
         
-        service = Service(ChromeDriverManager().install())
+        service = Service(find_chrome_driver())
         driver = webdriver.Chrome(service=service, options=chrome_options)
         driver.quit()
         
@@ -92,7 +174,6 @@ def create_test_structure():
         }
     }
     
-    import json
     with open(test_config, 'w') as f:
         json.dump(sample_config, f, indent=2)
     
@@ -196,7 +277,7 @@ def main():
     print(f"✅ Python {sys.version.split()[0]} detected")
     
     # Install dependencies
-    if not install_dependencies():
+    if not install_dependencies(only_if_missing="--reinstall" not in sys.argv):
         print("❌ Dependency installation failed")
         sys.exit(1)
     
@@ -3,29 +3,202 @@ Skadoosh AI DevOps Agent Platform
 Complete Python implementation of all agents with proper orchestration
 """
 
+import copy
+import hashlib
 import json
-import subprocess
 import os
+import shutil
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Any, Optional
 from abc import ABC, abstractmethod
 import cv2
 import numpy as np
-from PIL import Image
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from skimage.metrics import structural_similarity as ssim
 import tempfile
+import threading
 import time
-import openai
-import requests
 from dataclasses import dataclass
-from datetime import datetime
-import yaml
+from functools import lru_cache
+from datetime import datetime, timedelta
 from ..validation.component_anomaly_detector import ComponentAnomalyDetector
-from ..validation.llm_component_detector import LLMEnhancedAccuracyValidator
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Mock agent output templates, built once at import time
+_LAYOUT_HTML_TEMPLATE = '''
+<div class="app-container">
+  <header class="app-header" role="banner">
+    <nav class="navbar" [attr.aria-label]="'Main navigation'">
+      <div class="navbar-brand">
+        <img src="assets/logo.svg" alt="Company Logo" class="logo">
+      </div>
+      <ul class="navbar-nav" role="menubar">
+        <li class="nav-item" role="none">
+          <a class="nav-link" role="menuitem" [routerLink]="'/dashboard'">Dashboard</a>
+        </li>
+      </ul>
+    </nav>
+  </header>
+  
+  <main class="main-layout" role="main">
+    <aside class="sidebar" role="navigation" [attr.aria-label]="'Secondary navigation'">
+      <ul class="sidebar-menu">
+        <li><a [routerLink]="'/transfers'">Transfers</a></li>
+        <li><a [routerLink]="'/reports'">Reports</a></li>
+      </ul>
+    </aside>
+    
+    <section class="content-area">
+      <div class="data-panel">
+        <table class="data-table" role="table" [attr.aria-label]="'Data transfers'">
+          <thead>
+            <tr>
+              <th scope="col">Transfer ID</th>
+              <th scope="col">Status</th>
+              <th scope="col">Amount</th>
+              <th scope="col">Date</th>
+            </tr>
+          </thead>
+          <tbody>
+            <tr *ngFor="let transfer of transfers()">
+              <td>{{ transfer.id }}</td>
+              <td>{{ transfer.status }}</td>
+              <td>{{ transfer.amount | currency }}</td>
+              <td>{{ transfer.date | date }}</td>
+            </tr>
+          </tbody>
+        </table>
+      </div>
+    </section>
+  </main>
+</div>
+        '''
+
+_STYLE_SCSS = '''
+// Design tokens
+$primary-color: #007bff;
+$secondary-color: #6c757d;
+$success-color: #28a745;
+$font-family: 'Inter', -apple-system, BlinkMacSystemFont, sans-serif;
+$border-radius: 8px;
+$spacing-unit: 16px;
+
+// Component styles
+.app-container {
+  font-family: $font-family;
+  min-height: 100vh;
+  display: flex;
+  flex-direction: column;
+}
+
+.app-header {
+  background: $primary-color;
+  color: white;
+  padding: $spacing-unit;
+  box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+}
+
+// Responsive design
+@media (max-width: 768px) {
+  .main-layout {
+    flex-direction: column;
+  }
+}
+        '''
+
+_CODE_TYPESCRIPT_COMPONENT = '''
+import { Component, signal, computed, inject, OnInit, ChangeDetectionStrategy } from '@angular/core';
+import { CommonModule } from '@angular/common';
+import { RouterModule } from '@angular/router';
+import { FormBuilder, FormGroup, ReactiveFormsModule, Validators } from '@angular/forms';
+import { TransferService } from './services/transfer.service';
+
+export interface Transfer {
+  id: string;
+  status: 'pending' | 'completed' | 'failed';
+  amount: number;
+  date: Date;
+  description: string;
+}
+
+@Component({
+  selector: 'app-transfer-dashboard',
+  standalone: true,
+  imports: [CommonModule, RouterModule, ReactiveFormsModule],
+  templateUrl: './transfer-dashboard.component.html',
+  styleUrls: ['./transfer-dashboard.component.scss'],
+  changeDetection: ChangeDetectionStrategy.OnPush
+})
+export class TransferDashboardComponent implements OnInit {
+  private fb = inject(FormBuilder);
+  private transferService = inject(TransferService);
+  
+  // Signals for reactive state management
+  transfers = signal<Transfer[]>([]);
+  isLoading = signal(false);
+  error = signal<string | null>(null);
+  
+  // Computed values
+  totalAmount = computed(() => 
+    this.transfers().reduce((sum, transfer) => sum + transfer.amount, 0)
+  );
+  
+  ngOnInit(): void {
+    this.loadTransfers();
+  }
+  
+  async loadTransfers(): Promise<void> {
+    try {
+      this.isLoading.set(true);
+      this.error.set(null);
+      
+      const transfers = await this.transferService.getTransfers();
+      this.transfers.set(transfers);
+    } catch (error) {
+      this.error.set('Failed to load transfers. Please try again.');
+      console.error('Error loading transfers:', error);
+    } finally {
+      this.isLoading.set(false);
+    }
+  }
+}
+        '''
+
+_STUB_MOCK_DATA = '''
+export const MOCK_TRANSFERS: Transfer[] = [
+  {
+    id: 'txn_001',
+    status: 'completed',
+    amount: 1250.50,
+    date: new Date('2024-01-15'),
+    description: 'Payment to vendor ABC'
+  }
+];
+        '''
+
+_STUB_INTERCEPTOR = '''
+import { Injectable } from '@angular/core';
+import { HttpInterceptor, HttpRequest, HttpHandler, HttpResponse } from '@angular/common
+import { Observable, of, delay } from 'rxjs';
+import { MOCK_TRANSFERS } from './mock-data';
+
+@Injectable()
+export class MockTransferInterceptor implements HttpInterceptor {
+  intercept(req: HttpRequest<any>, next: HttpHandler): Observable<any> {
+    if (req.method === 'GET' && req.url.includes('/api/transfers')) {
+      return of(new HttpResponse({
+        status: 200,
+        body: MOCK_TRANSFERS
+      })).pipe(delay(500));
+    }
+    return next.handle(req);
+  }
+}
+        '''
 
 @dataclass
 class AgentContext:
@@ -56,25 +229,102 @@ class BaseAgent(ABC):
         self.model = model
         self.start_time = None
         self.end_time = None
+        self._start_ns = None
+        self._end_ns = None
         
+    def _mark_start(self):
+        """Record the wall-clock start for logs and a monotonic start for durations"""
+        self.start_time = datetime.now()
+        self._start_ns = time.perf_counter_ns()
+        self._end_ns = None
+    
+    def _mark_end(self):
+        """Record the end; end_time is derived from the monotonic clock rather than read again"""
+        self._end_ns = time.perf_counter_ns()
+        self.end_time = self.start_time + timedelta(microseconds=(self._end_ns - self._start_ns) // 1000)
+    
+    @property
+    def duration_seconds(self) -> float:
+        if self._start_ns is None or self._end_ns is None:
+            return 0
+        return (self._end_ns - self._start_ns) / 1e9
+    
     @abstractmethod
     def execute(self, context: AgentContext, input_data: Any) -> Dict[str, Any]:
         """Execute the agent's main functionality"""
         pass
     
-    def log_execution(self, context: AgentContext, input_data: Any, output: Dict[str, Any]):
-        """Log execution details to context trace"""
+    def log_execution(self, context: AgentContext, input_data: Any, output: Dict[str, Any], cached: bool = False):
+        """Log execution details to context trace (cached: output was reused, nothing ran)"""
+        now = datetime.now() if cached else None
         execution_entry = {
             "agent": self.name,
             "model": self.model,
-            "start_time": self.start_time,
-            "end_time": self.end_time,
-            "duration": (self.end_time - self.start_time).total_seconds() if self.end_time and self.start_time else 0,
+            "start_time": now if cached else self.start_time,
+            "end_time": now if cached else self.end_time,
+            "duration": 0 if cached else self.duration_seconds,
+            "cached": cached,
             "input": str(input_data)[:200] + "..." if len(str(input_data)) > 200 else str(input_data),
             "output_summary": str(output)[:200] + "..." if len(str(output)) > 200 else str(output)
         }
         context.execution_trace.append(execution_entry)
 
+def canonical_json(data: Any) -> str:
+    """Serialize agent inputs deterministically (sorted keys) for cache lookups"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(data, sort_keys=True, default=str)
+
+@lru_cache(maxsize=64)
+def _file_content_digest(path: str, mtime_ns: int, size: int) -> str:
+    """SHA-256 of a file, computed once per (path, mtime, size) so re-runs skip re-reading it"""
+    with open(path, "rb") as f:
+        if hasattr(hashlib, "file_digest"):  # Python 3.11+: buffered, hashes without the GIL
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        digest = hashlib.sha256()
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+        return digest.hexdigest()
+
+class AgentCache:
+    """Exact-match LRU cache for agent outputs, keyed on agent identity and inputs"""
+    
+    def __init__(self, max_size: int = 128, ttl_seconds: float = 3600.0):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+    
+    def make_key(self, agent: BaseAgent, context: AgentContext, input_data: Any) -> str:
+        """Hash the agent name/model, project context and inputs into a cache key"""
+        if isinstance(input_data, str) and os.path.isfile(input_data):
+            # Screenshots are keyed on content so identical images hit regardless of path
+            stat_result = os.stat(input_data)
+            payload = _file_content_digest(os.path.abspath(input_data), stat_result.st_mtime_ns, stat_result.st_size)
+        else:
+            payload = canonical_json(input_data)
+        
+        raw_key = f"{agent.name}|{agent.model}|{context.project_name}|{context.framework}|{payload}"
+        return hashlib.sha256(raw_key.encode("utf-8")).hexdigest()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        
+        stored_at, output = entry
+        if time.time() - stored_at > self.ttl_seconds:
+            del self._entries[key]
+            return None
+        
+        self._entries.move_to_end(key)
+        return copy.deepcopy(output)
+    
+    def set(self, key: str, output: Dict[str, Any]):
+        self._entries[key] = (time.time(), copy.deepcopy(output))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
 # Core Generation Agents
 class PromptEnhancerAgent(BaseAgent):
     """Enriches vague prompts with technical context"""
@@ -83,7 +333,7 @@ class PromptEnhancerAgent(BaseAgent):
         super().__init__("PromptEnhancerAgent", "phi-3-mini")
     
     def execute(self, context: AgentContext, input_data: str) -> Dict[str, Any]:
-        self.start_time = datetime.now()
+        self._mark_start()
         
         enhanced_prompt = f"""
         Project: {context.project_name}
@@ -111,7 +361,7 @@ class PromptEnhancerAgent(BaseAgent):
             "build_tool": "Angular CLI + Vite"
         }
         
-        self.end_time = datetime.now()
+        self._mark_end()
         
         output = {
             "enhanced_prompt": enhanced_prompt,
@@ -131,7 +381,7 @@ class PromptWriterAgent(BaseAgent):
         self.target_agent = target_agent
     
     def execute(self, context: AgentContext, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        self.start_time = datetime.now()
+        self._mark_start()
         
         prompts = {
             "VisionAgent": "Analyze uploaded screenshot: detect UI components like tabs, tables, buttons, forms. Extract layout hierarchy and component relationships.",
@@ -143,7 +393,7 @@ class PromptWriterAgent(BaseAgent):
         
         stage_prompt = prompts.get(self.target_agent, f"Execute {self.target_agent} with provided context")
         
-        self.end_time = datetime.now()
+        self._mark_end()
         
         output = {
             "target_agent": self.target_agent,
@@ -162,7 +412,7 @@ class VisionAgent(BaseAgent):
         super().__init__("VisionAgent", "phi-3-vision")
     
     def execute(self, context: AgentContext, input_data: str) -> Dict[str, Any]:
-        self.start_time = datetime.now()
+        self._mark_start()
         
         # Mock computer vision analysis
         ui_components = {
@@ -187,7 +437,7 @@ class VisionAgent(BaseAgent):
             }
         }
         
-        self.end_time = datetime.now()
+        self._mark_end()
         
         output = {
             "ui_components": ui_components,
@@ -206,61 +456,12 @@ class LayoutAgent(BaseAgent):
         super().__init__("LayoutAgent", "gemma-2b")
     
     def execute(self, context: AgentContext, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        self.start_time = datetime.now()
-        
-        html_template = '''
-<div class="app-container">
-  <header class="app-header" role="banner">
-    <nav class="navbar" [attr.aria-label]="'Main navigation'">
-      <div class="navbar-brand">
-        <img src="assets/logo.svg" alt="Company Logo" class="logo">
-      </div>
-      <ul class="navbar-nav" role="menubar">
-        <li class="nav-item" role="none">
-          <a class="nav-link" role="menuitem" [routerLink]="'/dashboard'">Dashboard</a>
-        </li>
-      </ul>
-    </nav>
-  </header>
-  
-  <main class="main-layout" role="main">
-    <aside class="sidebar" role="navigation" [attr.aria-label]="'Secondary navigation'">
-      <ul class="sidebar-menu">
-        <li><a [routerLink]="'/transfers'">Transfers</a></li>
-        <li><a [routerLink]="'/reports'">Reports</a></li>
-      </ul>
-    </aside>
-    
-    <section class="content-area">
-      <div class="data-panel">
-        <table class="data-table" role="table" [attr.aria-label]="'Data transfers'">
-          <thead>
-            <tr>
-              <th scope="col">Transfer ID</th>
-              <th scope="col">Status</th>
-              <th scope="col">Amount</th>
-              <th scope="col">Date</th>
-            </tr>
-          </thead>
-          <tbody>
-            <tr *ngFor="let transfer of transfers()">
-              <td>{{ transfer.id }}</td>
-              <td>{{ transfer.status }}</td>
-              <td>{{ transfer.amount | currency }}</td>
-              <td>{{ transfer.date | date }}</td>
-            </tr>
-          </tbody>
-        </table>
-      </div>
-    </section>
-  </main>
-</div>
-        '''
+        self._mark_start()
         
-        self.end_time = datetime.now()
+        self._mark_end()
         
         output = {
-            "html_template": html_template,
+            "html_template": _LAYOUT_HTML_TEMPLATE,
             "component_structure": "standalone",
             "accessibility_features": ["aria-labels", "roles", "semantic_html"],
             "responsive_design": True,
@@ -277,44 +478,12 @@ class StyleAgent(BaseAgent):
         super().__init__("StyleAgent", "phi-3-small")
     
     def execute(self, context: AgentContext, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        self.start_time = datetime.now()
-        
-        scss_styles = '''
-// Design tokens
-$primary-color: #007bff;
-$secondary-color: #6c757d;
-$success-color: #28a745;
-$font-family: 'Inter', -apple-system, BlinkMacSystemFont, sans-serif;
-$border-radius: 8px;
-$spacing-unit: 16px;
-
-// Component styles
-.app-container {
-  font-family: $font-family;
-  min-height: 100vh;
-  display: flex;
-  flex-direction: column;
-}
-
-.app-header {
-  background: $primary-color;
-  color: white;
-  padding: $spacing-unit;
-  box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-}
-
-// Responsive design
-@media (max-width: 768px) {
-  .main-layout {
-    flex-direction: column;
-  }
-}
-        '''
+        self._mark_start()
         
-        self.end_time = datetime.now()
+        self._mark_end()
         
         output = {
-            "scss_styles": scss_styles,
+            "scss_styles": _STYLE_SCSS,
             "design_tokens": {
                 "primary_color": "#007bff",
                 "font_family": "Inter",
@@ -335,70 +504,12 @@ class CodeAgent(BaseAgent):
         super().__init__("CodeAgent", "orca-2-7b")
     
     def execute(self, context: AgentContext, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        self.start_time = datetime.now()
-        
-        typescript_code = '''
-import { Component, signal, computed, inject, OnInit, ChangeDetectionStrategy } from '@angular/core';
-import { CommonModule } from '@angular/common';
-import { RouterModule } from '@angular/router';
-import { FormBuilder, FormGroup, ReactiveFormsModule, Validators } from '@angular/forms';
-import { TransferService } from './services/transfer.service';
-
-export interface Transfer {
-  id: string;
-  status: 'pending' | 'completed' | 'failed';
-  amount: number;
-  date: Date;
-  description: string;
-}
-
-@Component({
-  selector: 'app-transfer-dashboard',
-  standalone: true,
-  imports: [CommonModule, RouterModule, ReactiveFormsModule],
-  templateUrl: './transfer-dashboard.component.html',
-  styleUrls: ['./transfer-dashboard.component.scss'],
-  changeDetection: ChangeDetectionStrategy.OnPush
-})
-export class TransferDashboardComponent implements OnInit {
-  private fb = inject(FormBuilder);
-  private transferService = inject(TransferService);
-  
-  // Signals for reactive state management
-  transfers = signal<Transfer[]>([]);
-  isLoading = signal(false);
-  error = signal<string | null>(null);
-  
-  // Computed values
-  totalAmount = computed(() => 
-    this.transfers().reduce((sum, transfer) => sum + transfer.amount, 0)
-  );
-  
-  ngOnInit(): void {
-    this.loadTransfers();
-  }
-  
-  async loadTransfers(): Promise<void> {
-    try {
-      this.isLoading.set(true);
-      this.error.set(null);
-      
-      const transfers = await this.transferService.getTransfers();
-      this.transfers.set(transfers);
-    } catch (error) {
-      this.error.set('Failed to load transfers. Please try again.');
-      console.error('Error loading transfers:', error);
-    } finally {
-      this.isLoading.set(false);
-    }
-  }
-}
-        '''
+        self._mark_start()
         
-        self.end_time = datetime.now()
+        self._mark_end()
         
         output = {
-            "typescript_component": typescript_code,
+            "typescript_component": _CODE_TYPESCRIPT_COMPONENT,
             "features": [
                 "standalone_component",
                 "signals_state_management", 
@@ -421,45 +532,13 @@ class StubAgent(BaseAgent):
         super().__init__("StubAgent", "phi-3-mini")
     
     def execute(self, context: AgentContext, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        self.start_time = datetime.now()
-        
-        mock_data = '''
-export const MOCK_TRANSFERS: Transfer[] = [
-  {
-    id: 'txn_001',
-    status: 'completed',
-    amount: 1250.50,
-    date: new Date('2024-01-15'),
-    description: 'Payment to vendor ABC'
-  }
-];
-        '''
-        
-        interceptor_code = '''
-import { Injectable } from '@angular/core';
-import { HttpInterceptor, HttpRequest, HttpHandler, HttpResponse } from '@angular/common
-import { Observable, of, delay } from 'rxjs';
-import { MOCK_TRANSFERS } from './mock-data';
-
-@Injectable()
-export class MockTransferInterceptor implements HttpInterceptor {
-  intercept(req: HttpRequest<any>, next: HttpHandler): Observable<any> {
-    if (req.method === 'GET' && req.url.includes('/api/transfers')) {
-      return of(new HttpResponse({
-        status: 200,
-        body: MOCK_TRANSFERS
-      })).pipe(delay(500));
-    }
-    return next.handle(req);
-  }
-}
-        '''
+        self._mark_start()
         
-        self.end_time = datetime.now()
+        self._mark_end()
         
         output = {
-            "mock_data": mock_data,
-            "http_interceptor": interceptor_code,
+            "mock_data": _STUB_MOCK_DATA,
+            "http_interceptor": _STUB_INTERCEPTOR,
             "api_endpoints": ["/api/transfers"],
             "test_scenarios": ["success", "loading", "error"],
             "realistic_delays": True
@@ -476,7 +555,7 @@ class ValidationAgent(BaseAgent):
         super().__init__("ValidationAgent", "Local validator")
     
     def execute(self, context: AgentContext, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        self.start_time = datetime.now()
+        self._mark_start()
         
         validation_results = {
             "build": {"success": True, "errors": [], "warnings": ["Unused import in transfer.service.ts"]},
@@ -499,7 +578,7 @@ class ValidationAgent(BaseAgent):
             }
         }
         
-        self.end_time = datetime.now()
+        self._mark_end()
         
         output = {
             "validation_results": validation_results,
@@ -518,7 +597,7 @@ class CodeReviewAgent(BaseAgent):
         super().__init__("CodeReviewAgent", "phi-3-mini")
     
     def execute(self, context: AgentContext, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        self.start_time = datetime.now()
+        self._mark_start()
         
         review_findings = {
             "angular_best_practices": {
@@ -535,7 +614,7 @@ class CodeReviewAgent(BaseAgent):
             }
         }
         
-        self.end_time = datetime.now()
+        self._mark_end()
         
         output = {
             "review_findings": review_findings,
@@ -558,7 +637,7 @@ class EnhancementAgent(BaseAgent):
         super().__init__("EnhancementAgent", "gemma-2b")
     
     def execute(self, context: AgentContext, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        self.start_time = datetime.now()
+        self._mark_start()
         
         enhancements = {
             "accessibility_improvements": [
@@ -578,7 +657,7 @@ class EnhancementAgent(BaseAgent):
             ]
         }
         
-        self.end_time = datetime.now()
+        self._mark_end()
         
         output = {
             "enhancements_applied": enhancements,
@@ -598,7 +677,7 @@ class DocumentationAgent(BaseAgent):
         super().__init__("DocumentationAgent", "phi-3-mini")
     
     def execute(self, context: AgentContext, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        self.start_time = datetime.now()
+        self._mark_start()
         
         readme_content = f'''
 # {context.project_name}
@@ -625,7 +704,7 @@ ng serve
 Generated by Skadoosh AI DevOps Agent Platform 🧠
         '''
         
-        self.end_time = datetime.now()
+        self._mark_end()
         
         output = {
             "readme": readme_content,
@@ -645,7 +724,7 @@ class PipelineAgent(BaseAgent):
         super().__init__("PipelineAgent", "Local YAML generator")
     
     def execute(self, context: AgentContext, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        self.start_time = datetime.now()
+        self._mark_start()
         
         github_actions = '''
 name: CI/CD Pipeline
@@ -698,7 +777,7 @@ EXPOSE 80
 CMD ["nginx", "-g", "daemon off;"]
         '''
         
-        self.end_time = datetime.now()
+        self._mark_end()
         
         output = {
             "github_actions": github_actions,
@@ -790,7 +869,7 @@ class CarbonAgent(BaseAgent):
         }
     
     def execute(self, context: AgentContext, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        self.start_time = datetime.now()
+        self._mark_start()
         
         # Enhanced carbon calculation with LLM awareness
         total_emissions = 0
@@ -799,6 +878,9 @@ class CarbonAgent(BaseAgent):
         
         # Process execution trace for emissions
         for entry in context.execution_trace:
+            if entry.get("cached"):
+                continue  # Reused output, no model ran
+            
             model = entry.get("model", "unknown")
             tokens = entry.get("tokens", {})
             operation_type = entry.get("operation_type", "text")
@@ -825,7 +907,7 @@ class CarbonAgent(BaseAgent):
         # Get comprehensive session report if available
         session_report = self.get_session_carbon_report()
         
-        self.end_time = datetime.now()
+        self._mark_end()
         
         output = {
             "total_emissions_kg": round(total_emissions, 6),
@@ -858,7 +940,7 @@ class EmbeddingAgent(BaseAgent):
         super().__init__("EmbeddingAgent", "pgvector + local embeddings")
     
     def execute(self, context: AgentContext, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        self.start_time = datetime.now()
+        self._mark_start()
         
         embeddings_created = {
             "component_embeddings": "Generated embeddings for UI components",
@@ -867,7 +949,7 @@ class EmbeddingAgent(BaseAgent):
             "documentation_embeddings": "Generated embeddings for documentation"
         }
         
-        self.end_time = datetime.now()
+        self._mark_end()
         
         output = {
             "embeddings_created": embeddings_created,
@@ -890,7 +972,7 @@ class TimelineAgent(BaseAgent):
         super().__init__("TimelineAgent", "Timeline processor")
     
     def execute(self, context: AgentContext, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        self.start_time = datetime.now()
+        self._mark_start()
         
         timeline_data = {
             "execution_timeline": context.execution_trace,
@@ -900,7 +982,7 @@ class TimelineAgent(BaseAgent):
             "diff_tracking": "Input/output diffs available for each agent"
         }
         
-        self.end_time = datetime.now()
+        self._mark_end()
         
         output = {
             "timeline_data": timeline_data,
@@ -919,7 +1001,7 @@ class VersionAgent(BaseAgent):
         super().__init__("VersionAgent", "Version manager")
     
     def execute(self, context: AgentContext, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        self.start_time = datetime.now()
+        self._mark_start()
         
         version_data = {
             "current_version": "v1.0.0",
@@ -932,7 +1014,7 @@ class VersionAgent(BaseAgent):
             "snapshot_created": True
         }
         
-        self.end_time = datetime.now()
+        self._mark_end()
         
         output = {
             "version_data": version_data,
@@ -951,7 +1033,7 @@ class WalkthroughAgent(BaseAgent):
         super().__init__("WalkthroughAgent", "Demo generator")
     
     def execute(self, context: AgentContext, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        self.start_time = datetime.now()
+        self._mark_start()
         
         walkthrough_content = {
             "narration_script": f"This is {context.project_name}, a modern Angular application...",
@@ -966,7 +1048,7 @@ class WalkthroughAgent(BaseAgent):
             "presentation_ready": True
         }
         
-        self.end_time = datetime.now()
+        self._mark_end()
         
         output = {
             "walkthrough_content": walkthrough_content,
@@ -985,7 +1067,7 @@ class TestDataAgent(BaseAgent):
         super().__init__("TestDataAgent", "Faker engine")
     
     def execute(self, context: AgentContext, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        self.start_time = datetime.now()
+        self._mark_start()
         
         faker_schemas = {
             "transfer_schema": '''
@@ -999,7 +1081,7 @@ faker.transfer({
             '''
         }
         
-        self.end_time = datetime.now()
+        self._mark_end()
         
         output = {
             "faker_schemas": faker_schemas,
@@ -1018,7 +1100,7 @@ class HeatmapAgent(BaseAgent):
         super().__init__("HeatmapAgent", "Complexity analyzer")
     
     def execute(self, context: AgentContext, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        self.start_time = datetime.now()
+        self._mark_start()
         
         complexity_analysis = {
             "component_complexity": {
@@ -1036,7 +1118,7 @@ class HeatmapAgent(BaseAgent):
             }
         }
         
-        self.end_time = datetime.now()
+        self._mark_end()
         
         output = {
             "complexity_analysis": complexity_analysis,
@@ -1055,7 +1137,7 @@ class DeliveryAgent(BaseAgent):
         super().__init__("DeliveryAgent", "Export coordinator")
     
     def execute(self, context: AgentContext, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        self.start_time = datetime.now()
+        self._mark_start()
         
         delivery_checklist = {
             "layout_theme": True,
@@ -1077,7 +1159,7 @@ class DeliveryAgent(BaseAgent):
             "pdf_report": f"/exports/{context.project_name}_report.pdf"
         }
         
-        self.end_time = datetime.now()
+        self._mark_end()
         
         output = {
             "delivery_checklist": delivery_checklist,
@@ -1094,6 +1176,11 @@ class DeliveryAgent(BaseAgent):
 class AccuracyValidatorAgent(BaseAgent):
     """Validates visual accuracy by comparing deployed application with original input image"""
     
+    # Decoded reference screenshots shared across validation runs, keyed by (path, mtime, size)
+    _image_cache: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+    _image_cache_lock = threading.Lock()
+    image_cache_size = 4
+    
     def __init__(self, use_llm: bool = True):
         super().__init__("AccuracyValidatorAgent", "Visual comparison engine")
         self.driver = None
@@ -1102,10 +1189,14 @@ class AccuracyValidatorAgent(BaseAgent):
         
         # Initialize both traditional and LLM detectors
         self.component_detector = ComponentAnomalyDetector()
-        self.llm_validator = LLMEnhancedAccuracyValidator() if use_llm else None
+        self.llm_validator = None
+        if use_llm:
+            # Deferred: the LLM detector pulls in openai and PIL, which CV-only runs never need
+            from ..validation.llm_component_detector import LLMEnhancedAccuracyValidator
+            self.llm_validator = LLMEnhancedAccuracyValidator()
     
     def execute(self, context: AgentContext, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        self.start_time = datetime.now()
+        self._mark_start()
         
         try:
             # Extract input data
@@ -1130,7 +1221,7 @@ class AccuracyValidatorAgent(BaseAgent):
             # 3. Generate detailed analysis
             analysis = self._analyze_visual_differences(comparison_result, original_image_path, live_screenshot_path)
             
-            self.end_time = datetime.now()
+            self._mark_end()
             
             output = {
                 "deployed_url": deployed_url,
@@ -1147,7 +1238,7 @@ class AccuracyValidatorAgent(BaseAgent):
                 "difference_heatmap_path": comparison_result["heatmap_path"],
                 "detailed_analysis": analysis["detailed_report"],
                 "validation_timestamp": self.start_time.isoformat(),
-                "processing_time_seconds": (self.end_time - self.start_time).total_seconds()
+                "processing_time_seconds": self.duration_seconds
             }
             
             print(f"✅ Visual accuracy validation completed")
@@ -1158,7 +1249,7 @@ class AccuracyValidatorAgent(BaseAgent):
             return output
             
         except Exception as e:
-            self.end_time = datetime.now()
+            self._mark_end()
             error_output = {
                 "error": str(e),
                 "visual_accuracy_score": 0,
@@ -1176,6 +1267,12 @@ class AccuracyValidatorAgent(BaseAgent):
     
     def _capture_live_screenshot(self, url: str) -> str:
         """Capture screenshot of the deployed application"""
+        # Selenium is only needed for live validation, so keep it out of module import
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
         
         # Create temp directory for screenshots
         self.temp_dir = tempfile.mkdtemp(prefix="accuracy_validation_")
@@ -1238,14 +1335,50 @@ class AccuracyValidatorAgent(BaseAgent):
         except Exception as e:
             raise Exception(f"Failed to capture screenshot of {url}: {str(e)}")
     
+    def _load_reference_image(self, path: str) -> Optional[np.ndarray]:
+        """Load the original screenshot, reusing the decoded image while the file is unchanged"""
+        try:
+            stat_result = os.stat(path)
+        except OSError:
+            return None
+        
+        key = (os.path.abspath(path), stat_result.st_mtime_ns, stat_result.st_size)
+        cache = AccuracyValidatorAgent._image_cache
+        with AccuracyValidatorAgent._image_cache_lock:
+            image = cache.get(key)
+            if image is not None:
+                cache.move_to_end(key)
+                return image
+        
+        if stat_result.st_size == 0:
+            return None
+        # Decode outside the lock so concurrent agents (batch runs) decode in parallel;
+        # fromfile + imdecode also copes with non-ASCII paths that cv2.imread rejects on Windows
+        image = cv2.imdecode(np.fromfile(path, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            return None
+        # Shared between runs, so guard against in-place drawing
+        image.flags.writeable = False
+        
+        with AccuracyValidatorAgent._image_cache_lock:
+            cache[key] = image
+            cache.move_to_end(key)
+            while len(cache) > self.image_cache_size:
+                cache.popitem(last=False)
+        return image
+    
     def _compare_screenshots(self, original_path: str, live_path: str) -> Dict[str, Any]:
         """Compare original and live screenshots using multiple computer vision metrics"""
+        from skimage.metrics import structural_similarity as ssim
         
         print("🔍 Analyzing visual differences...")
         
-        # Load images
-        original_img = cv2.imread(original_path)
-        live_img = cv2.imread(live_path)
+        # Load images; decoding releases the GIL, so a cache miss on the original
+        # decodes alongside the live screenshot
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            original_future = executor.submit(self._load_reference_image, original_path)
+            live_img = cv2.imread(live_path)
+            original_img = original_future.result()
         
         if original_img is None:
             raise Exception(f"Failed to load original image: {original_path}")
@@ -1259,8 +1392,16 @@ class AccuracyValidatorAgent(BaseAgent):
         print(f"📏 Original image: {orig_width}x{orig_height}")
         print(f"📏 Live screenshot: {live_width}x{live_height}")
         
-        # Resize live image to match original dimensions for comparison
-        live_img_resized = cv2.resize(live_img, (orig_width, orig_height), interpolation=cv2.INTER_AREA)
+        # Resize live image to match original dimensions for comparison: area averaging
+        # to shrink, bilinear to enlarge, and no pass at all when the sizes already match
+        if (live_width, live_height) == (orig_width, orig_height):
+            live_img_resized = live_img
+        else:
+            shrinking = live_width * live_height > orig_width * orig_height
+            live_img_resized = cv2.resize(
+                live_img, (orig_width, orig_height),
+                interpolation=cv2.INTER_AREA if shrinking else cv2.INTER_LINEAR
+            )
         
         # Convert to grayscale for SSIM calculation
         original_gray = cv2.cvtColor(original_img, cv2.COLOR_BGR2GRAY)
@@ -1283,13 +1424,17 @@ class AccuracyValidatorAgent(BaseAgent):
         heatmap_path = self._generate_difference_heatmap(pixel_diff, os.path.join(self.temp_dir, "difference_heatmap.png"))
         
         # Analyze layout structure similarity
-        layout_match = self._analyze_layout_structure(original_img, live_img_resized)
+        layout_match = self._analyze_layout_structure(original_gray, live_gray)
         
         # Analyze color accuracy
         color_accuracy = self._analyze_color_accuracy(original_img, live_img_resized)
         
         # NEW: Component anomaly detection
-        component_anomalies = self._detect_component_anomalies(original_img, live_img_resized)
+        # The live file only matches live_img_resized when no resize was needed
+        component_anomalies = self._detect_component_anomalies(
+            original_img, live_img_resized, original_path,
+            live_path if (live_width, live_height) == (orig_width, orig_height) else None
+        )
         
         return {
             "similarity_score": float(similarity_score),
@@ -1305,21 +1450,23 @@ class AccuracyValidatorAgent(BaseAgent):
             }
         }
     
-    def _detect_component_anomalies(self, original_img: np.ndarray, live_img: np.ndarray) -> Dict[str, Any]:
+    def _detect_component_anomalies(self, original_img: np.ndarray, live_img: np.ndarray,
+                                    original_path: str = None, live_path: str = None) -> Dict[str, Any]:
         """Detect component anomalies using LLM or traditional CV methods"""
         
         if self.use_llm and self.llm_validator:
-            return self._detect_anomalies_with_llm(original_img, live_img)
+            return self._detect_anomalies_with_llm(original_img, live_img, original_path, live_path)
         else:
             return self._detect_anomalies_traditional(original_img, live_img)
     
-    def _detect_anomalies_with_llm(self, original_img: np.ndarray, live_img: np.ndarray) -> Dict[str, Any]:
+    def _detect_anomalies_with_llm(self, original_img: np.ndarray, live_img: np.ndarray,
+                                   original_path: str = None, live_path: str = None) -> Dict[str, Any]:
         """LLM-powered component anomaly detection"""
         print("🧠 Using LLM for intelligent component analysis...")
         
         try:
             # Use LLM for comprehensive analysis
-            llm_analysis = self.llm_validator.analyze_with_llm(original_img, live_img)
+            llm_analysis = self.llm_validator.analyze_with_llm(original_img, live_img, original_path, live_path)
             
             # Validate LLM analysis structure
             if not llm_analysis or not isinstance(llm_analysis, dict):
@@ -1332,7 +1479,8 @@ class AccuracyValidatorAgent(BaseAgent):
                 "component_accuracy": llm_analysis.get("component_accuracy", 0.0),
                 "detailed_report": llm_analysis.get("detailed_report", "LLM analysis incomplete"),
                 "comparison_analysis": llm_analysis.get("comparison_analysis", {}),
-                "model_used": llm_analysis.get("model_used", "Unknown")
+                "model_used": llm_analysis.get("model_used", "Unknown"),
+                "token_usage": llm_analysis.get("token_usage", {})
             }
             
             # Save component visualizations with LLM data
@@ -1426,8 +1574,7 @@ class AccuracyValidatorAgent(BaseAgent):
         orig_viz_path = os.path.join(self.temp_dir, "original_components_llm.png")
         live_viz_path = os.path.join(self.temp_dir, "live_components_llm.png")
         
-        cv2.imwrite(orig_viz_path, orig_vis)
-        cv2.imwrite(live_viz_path, live_vis)
+        self._write_images({orig_viz_path: orig_vis, live_viz_path: live_vis})
         
         print(f"📊 LLM Component visualizations saved:")
         print(f"   Original: {orig_viz_path}")
@@ -1529,11 +1676,11 @@ class AccuracyValidatorAgent(BaseAgent):
         }
     
     def _analyze_layout_structure(self, original_img: np.ndarray, live_img: np.ndarray) -> Dict[str, Any]:
-        """Analyze structural layout similarity between images"""
+        """Analyze structural layout similarity between images (BGR or already grayscale)"""
         try:
-            # Convert to grayscale
-            orig_gray = cv2.cvtColor(original_img, cv2.COLOR_BGR2GRAY)
-            live_gray = cv2.cvtColor(live_img, cv2.COLOR_BGR2GRAY)
+            # Convert to grayscale unless the caller already did
+            orig_gray = cv2.cvtColor(original_img, cv2.COLOR_BGR2GRAY) if original_img.ndim == 3 else original_img
+            live_gray = cv2.cvtColor(live_img, cv2.COLOR_BGR2GRAY) if live_img.ndim == 3 else live_img
             
             # Detect edges to analyze structure
             orig_edges = cv2.Canny(orig_gray, 50, 150)
@@ -1575,9 +1722,23 @@ class AccuracyValidatorAgent(BaseAgent):
                 "edge_density_live": 0.0
             }
     
+    @staticmethod
+    def _color_thumbnail(image: np.ndarray, max_side: int = 256) -> np.ndarray:
+        """Area-downscale an image so its longest edge is at most max_side"""
+        height, width = image.shape[:2]
+        scale = max_side / max(height, width)
+        if scale >= 1.0:
+            return image
+        return cv2.resize(image, (max(1, round(width * scale)), max(1, round(height * scale))), interpolation=cv2.INTER_AREA)
+    
     def _analyze_color_accuracy(self, original_img: np.ndarray, live_img: np.ndarray) -> Dict[str, Any]:
         """Analyze color accuracy between original and live images"""
         try:
+            # Histograms are about colour distribution, not detail, so a thumbnail
+            # gives the same correlations for a fraction of the pixels
+            original_img = self._color_thumbnail(original_img)
+            live_img = self._color_thumbnail(live_img)
+            
             # Convert to different color spaces for analysis
             orig_hsv = cv2.cvtColor(original_img, cv2.COLOR_BGR2HSV)
             live_hsv = cv2.cvtColor(live_img, cv2.COLOR_BGR2HSV)
@@ -1668,8 +1829,7 @@ class AccuracyValidatorAgent(BaseAgent):
             orig_path = os.path.join(self.temp_dir, "original_components.png")
             live_path = os.path.join(self.temp_dir, "live_components.png")
             
-            cv2.imwrite(orig_path, orig_vis)
-            cv2.imwrite(live_path, live_vis)
+            self._write_images({orig_path: orig_vis, live_path: live_vis})
             
             print(f"🧩 Component visualizations saved:")
             print(f"   📸 Original: {orig_path}")
@@ -1678,6 +1838,11 @@ class AccuracyValidatorAgent(BaseAgent):
         except Exception as e:
             print(f"⚠️  Error saving component visualizations: {e}")
     
+    def _write_images(self, images: Dict[str, np.ndarray]):
+        """Encode and write images concurrently (cv2.imwrite releases the GIL while encoding)"""
+        with ThreadPoolExecutor(max_workers=len(images)) as executor:
+            list(executor.map(lambda item: cv2.imwrite(*item), images.items()))
+    
     def _generate_difference_heatmap(self, pixel_diff: np.ndarray, output_path: str) -> str:
         """Generate a heatmap visualization of pixel differences"""
         try:
@@ -1719,7 +1884,6 @@ class AccuracyValidatorAgent(BaseAgent):
             # Clean up temp directory if it exists
             if hasattr(self, 'temp_dir') and self.temp_dir and os.path.exists(self.temp_dir):
                 try:
-                    import shutil
                     shutil.rmtree(self.temp_dir)
                     print(f"🧹 Cleaned up temp directory: {self.temp_dir}")
                 except Exception as e:
@@ -1766,6 +1930,24 @@ class SkadooshOrchestrator:
             "Code": PromptWriterAgent("CodeAgent"),
             "Stub": PromptWriterAgent("StubAgent")
         }
+        
+        # Exact-match cache in front of the LLM-backed generation agents
+        self.agent_cache = AgentCache()
+    
+    def _execute_cached(self, agent_name: str, context: AgentContext, input_data: Any) -> Dict[str, Any]:
+        """Run an agent, reusing a cached output when the same inputs were seen before"""
+        agent = self.agents[agent_name]
+        key = self.agent_cache.make_key(agent, context, input_data)
+        
+        output = self.agent_cache.get(key)
+        if output is not None:
+            print(f"♻️  {agent_name} cache hit")
+            agent.log_execution(context, input_data, output, cached=True)
+            return output
+        
+        output = agent.execute(context, input_data)
+        self.agent_cache.set(key, output)
+        return output
     
     def execute_workflow(self, project_name: str, user_prompt: str, uploads: Dict[str, Any] = None) -> Dict[str, Any]:
         """Execute the complete agent workflow following README architecture"""
@@ -1783,14 +1965,14 @@ class SkadooshOrchestrator:
             
             # 2. Vision Analysis with PromptWriter
             vision_prompt = self.prompt_writers["Vision"].execute(context, enhanced)
-            vision_result = self.agents["VisionAgent"].execute(context, uploads.get("screenshot", ""))
+            vision_result = self._execute_cached("VisionAgent", context, context.uploads.get("screenshot", ""))
             
             # Update embeddings early
             self.agents["EmbeddingAgent"].execute(context, vision_result)
             
             # 3. Layout Generation with PromptWriter
             layout_prompt = self.prompt_writers["Layout"].execute(context, vision_result)
-            layout_result = self.agents["LayoutAgent"].execute(context, vision_result)
+            layout_result = self._execute_cached("LayoutAgent", context, vision_result)
             
             # Update embeddings
             self.agents["EmbeddingAgent"].execute(context, layout_result)
@@ -1801,7 +1983,7 @@ class SkadooshOrchestrator:
             
             # 5. Code Generation with PromptWriter
             code_prompt = self.prompt_writers["Code"].execute(context, style_result)
-            code_result = self.agents["CodeAgent"].execute(context, style_result)
+            code_result = self._execute_cached("CodeAgent", context, style_result)
             
             # Update embeddings
             self.agents["EmbeddingAgent"].execute(context, code_result)
@@ -1827,7 +2009,7 @@ class SkadooshOrchestrator:
                     print("❌ Validation failed, enhancing...")
                     enhancement_result = self.agents["EnhancementAgent"].execute(context, validation_result)
                     if enhancement_result["code_regenerated"]:
-                        code_result = self.agents["CodeAgent"].execute(context, enhancement_result)
+                        code_result = self._execute_cached("CodeAgent", context, enhancement_result)
             
             # 8. Code Review
             if validation_passed:
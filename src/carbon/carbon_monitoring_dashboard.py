@@ -4,6 +4,7 @@ Carbon Monitoring Dashboard
 Real-time monitoring and optimization for LLM carbon footprints
 """
 
+import bisect
 import os
 import json
 import time
@@ -30,6 +31,7 @@ class CarbonDashboard:
         self.calculator = LLMCarbonCalculator() if CARBON_TRACKING_AVAILABLE else None
         self.carbon_history = []
         self.alerts = []
+        self._alert_times = []  # time.time() per alert, parallel to self.alerts
         self.budgets = {
             "daily_kg": 0.1,
             "hourly_kg": 0.02,
@@ -96,7 +98,7 @@ class CarbonDashboard:
         
         # Check per-operation limit
         if emissions_kg > self.budgets["per_operation_kg"]:
-            self.alerts.append({
+            self._add_alert({
                 "timestamp": datetime.now().isoformat(),
                 "type": "per_operation_limit",
                 "severity": "warning",
@@ -108,7 +110,7 @@ class CarbonDashboard:
         # Check model-specific limits
         model_limit = self.budgets["model_limits"].get(model, self.budgets["model_limits"]["gpt-4o"])
         if emissions_kg > model_limit:
-            self.alerts.append({
+            self._add_alert({
                 "timestamp": datetime.now().isoformat(),
                 "type": "model_limit",
                 "severity": "warning",
@@ -119,7 +121,7 @@ class CarbonDashboard:
         
         # Check session accumulation against daily budget
         if self.current_session["total_carbon_kg"] > self.budgets["daily_kg"]:
-            self.alerts.append({
+            self._add_alert({
                 "timestamp": datetime.now().isoformat(),
                 "type": "daily_budget",
                 "severity": "critical",
@@ -132,7 +134,7 @@ class CarbonDashboard:
         if session_duration_hours > 0:
             hourly_rate = self.current_session["total_carbon_kg"] / session_duration_hours
             if hourly_rate > self.budgets["hourly_kg"]:
-                self.alerts.append({
+                self._add_alert({
                     "timestamp": datetime.now().isoformat(),
                     "type": "hourly_rate",
                     "severity": "warning",
@@ -140,6 +142,16 @@ class CarbonDashboard:
                     "hourly_rate": hourly_rate
                 })
     
+    def _add_alert(self, alert: Dict[str, Any]):
+        """Record an alert along with its creation time for recency queries"""
+        self.alerts.append(alert)
+        self._alert_times.append(time.time())
+    
+    def _recent_alerts(self, max_age_seconds: float) -> List[Dict[str, Any]]:
+        """Alerts raised within max_age_seconds (alerts are stored in time order)"""
+        cutoff = time.time() - max_age_seconds
+        return self.alerts[bisect.bisect_left(self._alert_times, cutoff):]
+    
     def get_real_time_status(self) -> Dict[str, Any]:
         """Get current dashboard status"""
         
@@ -156,8 +168,7 @@ class CarbonDashboard:
         hourly_utilization = (carbon_per_hour / self.budgets["hourly_kg"]) * 100 if carbon_per_hour > 0 else 0
         
         # Recent alerts
-        recent_alerts = [a for a in self.alerts if 
-                        (datetime.now() - datetime.fromisoformat(a["timestamp"])).total_seconds() < 3600]
+        recent_alerts = self._recent_alerts(3600)
         
         return {
             "session_info": {
@@ -223,8 +234,7 @@ class CarbonDashboard:
         if ops_per_hour > 50:
             recommendations.append("⚡ High operation frequency - implement rate limiting")
         
-        recent_alerts = [a for a in self.alerts if 
-                        (datetime.now() - datetime.fromisoformat(a["timestamp"])).total_seconds() < 1800]
+        recent_alerts = self._recent_alerts(1800)
         
         if recent_alerts:
             recommendations.append("⚠️  Recent budget alerts - review operation efficiency")
@@ -236,60 +246,70 @@ class CarbonDashboard:
         
         status = self.get_real_time_status()
         
-        # Clear screen (works on most terminals)
-        os.system('clear' if os.name == 'posix' else 'cls')
+        # Build the whole frame first and write it once, so a refresh is a single
+        # stdout write instead of ~30 line-buffered prints
+        lines = []
+        p = lines.append
         
-        print("🌍 LLM Carbon Monitoring Dashboard")
-        print("=" * 60)
-        print(f"⏰ Last Updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        p("🌍 LLM Carbon Monitoring Dashboard")
+        p("=" * 60)
+        p(f"⏰ Last Updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         
         # Session info
         session = status["session_info"]
-        print(f"\n📊 Session Overview:")
-        print(f"   Duration: {session['duration_hours']} hours")
-        print(f"   Operations: {session['total_operations']}")
-        print(f"   Models Used: {', '.join(session['models_used']) if session['models_used'] else 'None'}")
-        print(f"   Total Carbon: {session['total_carbon_kg']:.6f} kg CO2e")
+        p(f"\n📊 Session Overview:")
+        p(f"   Duration: {session['duration_hours']} hours")
+        p(f"   Operations: {session['total_operations']}")
+        p(f"   Models Used: {', '.join(session['models_used']) if session['models_used'] else 'None'}")
+        p(f"   Total Carbon: {session['total_carbon_kg']:.6f} kg CO2e")
         
         # Rates
         rates = status["rates"]
-        print(f"\n📈 Current Rates:")
-        print(f"   Operations/Hour: {rates['operations_per_hour']}")
-        print(f"   Carbon/Hour: {rates['carbon_per_hour_kg']:.6f} kg CO2e")
-        print(f"   Carbon/Operation: {rates['carbon_per_operation_kg']:.6f} kg CO2e")
+        p(f"\n📈 Current Rates:")
+        p(f"   Operations/Hour: {rates['operations_per_hour']}")
+        p(f"   Carbon/Hour: {rates['carbon_per_hour_kg']:.6f} kg CO2e")
+        p(f"   Carbon/Operation: {rates['carbon_per_operation_kg']:.6f} kg CO2e")
         
         # Budget status
         budget = status["budget_status"]
-        print(f"\n💰 Budget Status: {budget['status']}")
-        print(f"   Daily Utilization: {budget['daily_utilization_percent']:.1f}%")
-        print(f"   Hourly Utilization: {budget['hourly_utilization_percent']:.1f}%")
-        print(f"   Remaining Budget: {budget['remaining_daily_budget_kg']:.6f} kg CO2e")
+        p(f"\n💰 Budget Status: {budget['status']}")
+        p(f"   Daily Utilization: {budget['daily_utilization_percent']:.1f}%")
+        p(f"   Hourly Utilization: {budget['hourly_utilization_percent']:.1f}%")
+        p(f"   Remaining Budget: {budget['remaining_daily_budget_kg']:.6f} kg CO2e")
         
         # Alerts
         alerts = status["alerts"]
-        print(f"\n🚨 Alerts:")
-        print(f"   Total: {alerts['total_alerts']} | Recent: {alerts['recent_alerts']} | Critical: {alerts['critical_alerts']}")
+        p(f"\n🚨 Alerts:")
+        p(f"   Total: {alerts['total_alerts']} | Recent: {alerts['recent_alerts']} | Critical: {alerts['critical_alerts']}")
         
         if alerts["latest_alerts"]:
-            print(f"   Latest Alerts:")
+            p(f"   Latest Alerts:")
             for alert in alerts["latest_alerts"][-3:]:  # Show last 3
                 time_str = datetime.fromisoformat(alert["timestamp"]).strftime('%H:%M:%S')
                 severity_icon = "🔴" if alert["severity"] == "critical" else "🟡"
-                print(f"      {severity_icon} {time_str}: {alert['message'][:50]}...")
+                p(f"      {severity_icon} {time_str}: {alert['message'][:50]}...")
         
         # Recommendations
-        print(f"\n💡 Recommendations:")
+        p(f"\n💡 Recommendations:")
         for rec in status["recommendations"]:
-            print(f"   {rec}")
+            p(f"   {rec}")
         
         # Progress bars for budget utilization
         daily_progress = min(100, budget['daily_utilization_percent'])
         daily_bar = "█" * int(daily_progress / 5) + "░" * (20 - int(daily_progress / 5))
-        print(f"\n📊 Daily Budget: [{daily_bar}] {daily_progress:.1f}%")
+        p(f"\n📊 Daily Budget: [{daily_bar}] {daily_progress:.1f}%")
         
         hourly_progress = min(100, budget['hourly_utilization_percent'])
         hourly_bar = "█" * int(hourly_progress / 5) + "░" * (20 - int(hourly_progress / 5))
-        print(f"⏰ Hourly Rate:  [{hourly_bar}] {hourly_progress:.1f}%")
+        p(f"⏰ Hourly Rate:  [{hourly_bar}] {hourly_progress:.1f}%")
+        
+        # Clear screen (ANSI on posix avoids spawning a shell per refresh)
+        if os.name == 'posix':
+            sys.stdout.write("\033[2J\033[H")
+        else:
+            os.system('cls')
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
     
     def export_session_report(self) -> str:
         """Export detailed session report"""
@@ -6,6 +6,9 @@ Simple .env file loader for the accuracy validator
 import os
 from pathlib import Path
 
+# .env files already applied in this process, keyed by (resolved path, mtime)
+_loaded_env_files = set()
+
 def load_env_file(env_path='.env'):
     """Load environment variables from .env file"""
     env_file = Path(env_path)
@@ -14,6 +17,11 @@ def load_env_file(env_path='.env'):
         print(f"❌ No .env file found at {env_file}")
         return False
     
+    # Many test modules call this at import; only re-parse when the file changed
+    cache_key = (str(env_file.resolve()), env_file.stat().st_mtime_ns)
+    if cache_key in _loaded_env_files:
+        return True
+    
     print(f"📄 Loading environment from {env_file}")
     
     try:
@@ -43,6 +51,7 @@ def load_env_file(env_path='.env'):
                 else:
                     print(f"⚠️  Skipping invalid line {line_num}: {line}")
         
+        _loaded_env_files.add(cache_key)
         return True
         
     except Exception as e:
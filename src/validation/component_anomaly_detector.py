@@ -6,7 +6,16 @@ Detects missing, misplaced, or incorrectly implemented UI components
 import cv2
 import numpy as np
 from typing import Dict, List, Any, Tuple
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache
+
+try:
+    from scipy.optimize import linear_sum_assignment
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
 
 @dataclass
 class ComponentMatch:
@@ -22,333 +31,384 @@ class ComponentMatch:
         if self.anomalies is None:
             self.anomalies = []
 
+COMPONENT_TYPES = ("button", "input_field", "navigation", "card", "table", "text")
+TYPE_IDS = {component_type: type_id for type_id, component_type in enumerate(COMPONENT_TYPES)}
+BREAKDOWN_ORDER = sorted(range(len(COMPONENT_TYPES)), key=COMPONENT_TYPES.__getitem__)  # Reports list types alphabetically
+
+@dataclass
+class ComponentSet:
+    """Detections stored as parallel arrays, materialized as ComponentMatch objects only at the end"""
+    bboxes: np.ndarray      # (N, 4) int64 x, y, w, h
+    types: np.ndarray       # (N,) uint8 index into COMPONENT_TYPES
+    confidence: np.ndarray  # (N,) float64
+    
+    @classmethod
+    def from_boxes(cls, boxes, component_type: str, confidence: float) -> "ComponentSet":
+        bboxes = np.asarray(boxes, dtype=np.int64).reshape(-1, 4)
+        n = len(bboxes)
+        return cls(bboxes, np.full(n, TYPE_IDS[component_type], dtype=np.uint8),
+                   np.full(n, confidence, dtype=np.float64))
+    
+    @classmethod
+    def from_matches(cls, components: List[ComponentMatch], prefer_live_bbox: bool = False) -> "ComponentSet":
+        bboxes = [(c.live_bbox or c.original_bbox) if prefer_live_bbox else c.original_bbox for c in components]
+        return cls(np.asarray(bboxes, dtype=np.int64).reshape(-1, 4),
+                   np.fromiter((TYPE_IDS[c.component_type] for c in components), dtype=np.uint8, count=len(components)),
+                   np.fromiter((c.confidence for c in components), dtype=np.float64, count=len(components)))
+    
+    @classmethod
+    def concatenate(cls, sets: List["ComponentSet"]) -> "ComponentSet":
+        return cls(np.concatenate([s.bboxes for s in sets]),
+                   np.concatenate([s.types for s in sets]),
+                   np.concatenate([s.confidence for s in sets]))
+    
+    def __len__(self) -> int:
+        return len(self.bboxes)
+    
+    def where(self, component_type: str = None, min_confidence: float = None) -> np.ndarray:
+        """Boolean mask of the components matching every given filter"""
+        mask = np.ones(len(self), dtype=bool)
+        if component_type is not None:
+            mask &= self.types == TYPE_IDS[component_type]
+        if min_confidence is not None:
+            mask &= self.confidence >= min_confidence
+        return mask
+    
+    def subset(self, indices) -> "ComponentSet":
+        return ComponentSet(self.bboxes[indices], self.types[indices], self.confidence[indices])
+    
+    def to_matches(self) -> List[ComponentMatch]:
+        return [
+            ComponentMatch(
+                component_type=COMPONENT_TYPES[type_id],
+                confidence=confidence,
+                original_bbox=tuple(bbox),
+                match_status="detected"
+            )
+            for bbox, type_id, confidence in zip(self.bboxes.tolist(), self.types.tolist(), self.confidence.tolist())
+        ]
+
+@lru_cache(maxsize=None)
+def _rect_kernel(width: int, height: int) -> np.ndarray:
+    """Shared read-only rectangular structuring element, built once per size"""
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (width, height))
+    kernel.flags.writeable = False
+    return kernel
+
+@dataclass
+class DetectContext:
+    """Per-image intermediates computed once and shared by all detectors"""
+    scale: int                      # full-resolution pixels per detection pixel
+    image: np.ndarray
+    gray: np.ndarray
+    edges_low: np.ndarray           # Canny(30, 100)
+    edges_high: np.ndarray          # Canny(50, 150)
+    integral: np.ndarray            # integral image of gray
+    integral_sq: np.ndarray         # squared integral image of gray
+    edges_high_integral: np.ndarray # integral image of edges_high > 0
+
 class ComponentAnomalyDetector:
     """Advanced component detection and anomaly analysis"""
     
     def __init__(self):
         self.similarity_threshold = 0.6
         self.position_tolerance = 100
+        self.merge_grid_cell_size = 128
+        self.min_otsu_text_elements = 5
+        self.max_otsu_foreground_ratio = 0.1
+        self.detection_max_side = 1024
         
     def detect_components(self, image: np.ndarray, image_type: str = "original") -> List[ComponentMatch]:
         """Detect UI components using multiple detection methods"""
         print(f"🔍 Detecting components in {image_type} image...")
         
-        components = []
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        
-        # Method 1: Button detection
-        components.extend(self._detect_buttons(image, gray))
-        
-        # Method 2: Input field detection
-        components.extend(self._detect_input_fields(image, gray))
-        
-        # Method 3: Navigation detection
-        components.extend(self._detect_navigation(image, gray))
-        
-        # Method 4: Card/container detection
-        components.extend(self._detect_cards(image, gray))
-        
-        # Method 5: Table detection
-        components.extend(self._detect_tables(image, gray))
-        
-        # Method 6: Text/label detection
-        components.extend(self._detect_text_elements(image, gray))
+        ctx = self._build_context(image)
+        
+        detectors = [
+            # Method 1: Button detection
+            self._detect_buttons,
+            # Method 2: Input field detection
+            self._detect_input_fields,
+            # Method 3: Navigation detection
+            self._detect_navigation,
+            # Method 4: Card/container detection
+            self._detect_cards,
+            # Method 5: Table detection
+            self._detect_tables,
+            # Method 6: Text/label detection
+            self._detect_text_elements,
+        ]
+        
+        # The detectors only read the shared context and spend their time in OpenCV calls
+        # that release the GIL, so they run concurrently; results keep the method order
+        with ThreadPoolExecutor(max_workers=len(detectors)) as executor:
+            futures = [executor.submit(detector, ctx) for detector in detectors]
+            detections = ComponentSet.concatenate([future.result() for future in futures])
+        
+        # Back to full-resolution coordinates
+        detections.bboxes *= ctx.scale
         
         # Remove duplicates and merge overlapping detections
-        components = self._merge_overlapping_components(components)
+        components = self._merge_overlapping_components(detections).to_matches()
         
         print(f"✅ Detected {len(components)} components in {image_type} image")
         return components
     
-    def _detect_buttons(self, image: np.ndarray, gray: np.ndarray) -> List[ComponentMatch]:
-        """Detect button components"""
-        components = []
+    def _build_context(self, image: np.ndarray) -> DetectContext:
+        """Compute the grayscale, edge and integral images shared by all detectors in a single place"""
+        # Very large screenshots (e.g. full-page captures) are downscaled once by an integer
+        # factor; detector thresholds are given in full-resolution pixels and scaled to match
+        height, width = image.shape[:2]
+        scale = max(1, max(height, width) // self.detection_max_side)
+        if scale > 1:
+            image = cv2.resize(image, (width // scale, height // scale), interpolation=cv2.INTER_AREA)
         
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        edges_low = cv2.Canny(gray, 30, 100)
+        edges_high = cv2.Canny(gray, 50, 150)
+        integral, integral_sq = cv2.integral2(gray, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
+        edges_high_integral = cv2.integral((edges_high > 0).astype(np.uint8))
+        return DetectContext(scale, image, gray, edges_low, edges_high, integral, integral_sq, edges_high_integral)
+    
+    def _bounding_boxes(self, binary: np.ndarray) -> np.ndarray:
+        """Bounding boxes (x, y, w, h) of the outermost blobs in a binary mask, as an (N, 4) array"""
+        # Fill enclosed holes so nested blobs join their parent, matching findContours(RETR_EXTERNAL),
+        # then label every blob in one pass instead of tracing contours one by one
+        padded = cv2.copyMakeBorder((binary > 0).astype(np.uint8), 1, 1, 1, 1, cv2.BORDER_CONSTANT, value=0)
+        cv2.floodFill(padded, None, (0, 0), 2)
+        filled = (padded[1:-1, 1:-1] != 2).astype(np.uint8)
+        
+        _, _, stats, _ = cv2.connectedComponentsWithStats(filled, connectivity=8)
+        return stats[1:, [cv2.CC_STAT_LEFT, cv2.CC_STAT_TOP, cv2.CC_STAT_WIDTH, cv2.CC_STAT_HEIGHT]].astype(np.int64)
+    
+    @staticmethod
+    def _box_filter(boxes: np.ndarray, min_area: int, max_area: int, min_aspect: float, max_aspect: float,
+                    min_w: int = 0, min_h: int = 0, scale: int = 1) -> np.ndarray:
+        """Keep the boxes whose area, aspect ratio and size (in full-resolution pixels) fall within the given limits"""
+        w, h = boxes[:, 2] * scale, boxes[:, 3] * scale
+        area = w * h
+        aspect_ratio = np.divide(w, h, out=np.zeros(len(boxes)), where=h > 0)
+        mask = ((area >= min_area) & (area <= max_area) &
+                (aspect_ratio >= min_aspect) & (aspect_ratio <= max_aspect) &
+                (w >= min_w) & (h >= min_h))
+        return boxes[mask]
+    
+    @staticmethod
+    def _kernel(ctx: DetectContext, size: Tuple[int, int]) -> np.ndarray:
+        """Rectangular structuring element of a full-resolution size, scaled to the detection image"""
+        width, height = size
+        return _rect_kernel(max(1, round(width / ctx.scale)), max(1, round(height / ctx.scale)))
+    
+    def _detect_buttons(self, ctx: DetectContext) -> ComponentSet:
+        """Detect button components"""
         # Use edge detection and morphological operations
-        edges = cv2.Canny(gray, 50, 150)
-        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
-        processed = cv2.morphologyEx(edges, cv2.MORPH_CLOSE, kernel)
+        kernel = self._kernel(ctx, (3, 3))
+        processed = cv2.morphologyEx(ctx.edges_high, cv2.MORPH_CLOSE, kernel)
         
-        contours, _ = cv2.findContours(processed, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        # Button characteristics: moderate size, rectangular shape
+        candidates = self._box_filter(self._bounding_boxes(processed), 800, 20000, 0.5, 8.0, min_w=40, min_h=20,
+                                      scale=ctx.scale)
         
-        for contour in contours:
-            x, y, w, h = cv2.boundingRect(contour)
-            area = w * h
-            aspect_ratio = w / h if h > 0 else 0
-            
-            # Button characteristics: moderate size, rectangular shape
-            if (800 <= area <= 20000 and 
-                0.5 <= aspect_ratio <= 8.0 and
-                w >= 40 and h >= 20):
-                
-                roi = gray[y:y+h, x:x+w]
-                
-                # Check for button-like characteristics
-                if self._has_button_characteristics(roi):
-                    components.append(ComponentMatch(
-                        component_type="button",
-                        confidence=0.8,
-                        original_bbox=(x, y, w, h),
-                        match_status="detected"
-                    ))
+        # Check for button-like characteristics
+        buttons = candidates[self._has_button_characteristics(candidates, ctx)]
         
-        return components
+        return ComponentSet.from_boxes(buttons, "button", 0.8)
     
-    def _has_button_characteristics(self, roi: np.ndarray) -> bool:
-        """Check if region has button-like visual characteristics"""
-        if roi.size == 0:
-            return False
-            
-        # Check color uniformity (buttons often have solid backgrounds)
-        color_variance = np.var(roi)
-        
-        # Check for moderate edge density
-        edges = cv2.Canny(roi, 50, 150)
-        edge_density = np.sum(edges > 0) / max(edges.size, 1)
-        
-        return (color_variance < 4000 and  # Relatively uniform
-                0.02 < edge_density < 0.5)      # Some edges but not too many
+    def _has_button_characteristics(self, boxes: np.ndarray, ctx: DetectContext) -> np.ndarray:
+        """Check which (N, 4) regions have button-like visual characteristics"""
+        pixel_count = (boxes[:, 2] * boxes[:, 3]).astype(np.float64)
+        valid = pixel_count > 0
+        pixel_count[~valid] = 1
+        
+        # Check color uniformity (buttons often have solid backgrounds), O(1) per box via integral images
+        mean = self._region_sum(ctx.integral, boxes) / pixel_count
+        color_variance = self._region_sum(ctx.integral_sq, boxes) / pixel_count - mean * mean
+        
+        # Check for moderate edge density, reusing the image-wide edge map
+        edge_density = self._region_sum(ctx.edges_high_integral, boxes) / pixel_count
+        
+        return (valid &
+                (color_variance < 4000) &  # Relatively uniform
+                (0.02 < edge_density) & (edge_density < 0.5))      # Some edges but not too many
+    
+    @staticmethod
+    def _region_sum(integral: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+        """Sums of the pixels inside each (N, 4) box, looked up from an integral image"""
+        x, y, w, h = boxes.T
+        return (integral[y + h, x + w] - integral[y, x + w] - integral[y + h, x] + integral[y, x]).astype(np.float64)
     
-    def _detect_input_fields(self, image: np.ndarray, gray: np.ndarray) -> List[ComponentMatch]:
+    def _detect_input_fields(self, ctx: DetectContext) -> ComponentSet:
         """Detect input field components"""
-        components = []
-        
-        # Look for rectangular regions with clear borders
-        edges = cv2.Canny(gray, 30, 100)
-        
         # Dilate to connect broken lines
-        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (2, 2))
-        edges = cv2.dilate(edges, kernel, iterations=1)
+        kernel = self._kernel(ctx, (2, 2))
+        dilated = cv2.dilate(ctx.edges_low, kernel, iterations=1)
         
-        contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        # Input field characteristics: rectangular, wider than tall
+        candidates = self._box_filter(self._bounding_boxes(dilated), 1500, 40000, 3.0, 20.0, min_w=80, min_h=25,
+                                      scale=ctx.scale)
         
-        for contour in contours:
-            x, y, w, h = cv2.boundingRect(contour)
-            area = w * h
-            aspect_ratio = w / h if h > 0 else 0
-            
-            # Input field characteristics: rectangular, wider than tall
-            if (1500 <= area <= 40000 and 
-                3.0 <= aspect_ratio <= 20.0 and
-                w >= 80 and h >= 25):
-                
-                components.append(ComponentMatch(
-                    component_type="input_field",
-                    confidence=0.7,
-                    original_bbox=(x, y, w, h),
-                    match_status="detected"
-                ))
-        
-        return components
+        return ComponentSet.from_boxes(candidates, "input_field", 0.7)
     
-    def _detect_navigation(self, image: np.ndarray, gray: np.ndarray) -> List[ComponentMatch]:
+    def _detect_navigation(self, ctx: DetectContext) -> ComponentSet:
         """Detect navigation components"""
-        components = []
-        h, w = gray.shape
+        navigation_boxes = []
+        h = ctx.gray.shape[0] * ctx.scale
         
         # Scan horizontal strips for navigation patterns
         strip_height = 100
-        for y in range(0, min(h//3, 300), 50):  # Look in top portion
-            strip = gray[y:y+strip_height, :]
-            
-            # Look for horizontal text arrangements
-            edges = cv2.Canny(strip, 50, 150)
-            contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-            
-            horizontal_elements = []
-            for contour in contours:
-                x_rel, y_rel, w_rel, h_rel = cv2.boundingRect(contour)
-                area = w_rel * h_rel
-                aspect_ratio = w_rel / h_rel if h_rel > 0 else 0
-                
-                # Look for text-like elements
-                if (200 <= area <= 5000 and 
-                    1.0 <= aspect_ratio <= 10.0):
-                    horizontal_elements.append((x_rel, y_rel, w_rel, h_rel))
+        for strip_y in range(0, min(h//3, 300), 50):  # Look in top portion
+            # Look for horizontal text arrangements in this strip of the shared edge map
+            y = strip_y // ctx.scale
+            strip_edges = ctx.edges_high[y:(strip_y + strip_height) // ctx.scale, :]
+            # Look for text-like elements
+            horizontal_elements = self._box_filter(self._bounding_boxes(strip_edges), 200, 5000, 1.0, 10.0,
+                                                   scale=ctx.scale)
             
             # If we have multiple horizontal elements, it might be navigation
             if len(horizontal_elements) >= 2:
                 # Calculate bounding box for the entire navigation
-                all_x = [x for x, y, w, h in horizontal_elements]
-                all_y = [y for x, y, w, h in horizontal_elements]
-                all_right = [x + w for x, y, w, h in horizontal_elements]
-                all_bottom = [y + h for x, y, w, h in horizontal_elements]
+                left = int(horizontal_elements[:, 0].min())
+                top = int(horizontal_elements[:, 1].min())
+                right = int((horizontal_elements[:, 0] + horizontal_elements[:, 2]).max())
+                bottom = int((horizontal_elements[:, 1] + horizontal_elements[:, 3]).max())
                 
-                nav_x = min(all_x)
-                nav_y = y + min(all_y)
-                nav_w = max(all_right) - min(all_x)
-                nav_h = max(all_bottom) - min(all_y)
+                nav_x = left
+                nav_y = y + top
+                nav_w = right - left
+                nav_h = bottom - top
                 
-                components.append(ComponentMatch(
-                    component_type="navigation",
-                    confidence=0.6,
-                    original_bbox=(nav_x, nav_y, nav_w, nav_h),
-                    match_status="detected"
-                ))
+                navigation_boxes.append((nav_x, nav_y, nav_w, nav_h))
         
-        return components
+        return ComponentSet.from_boxes(navigation_boxes, "navigation", 0.6)
     
-    def _detect_cards(self, image: np.ndarray, gray: np.ndarray) -> List[ComponentMatch]:
+    def _detect_cards(self, ctx: DetectContext) -> ComponentSet:
         """Detect card/container components"""
-        components = []
-        
-        # Look for rectangular regions with potential shadows/borders
-        edges = cv2.Canny(gray, 30, 100)
-        
         # Use larger kernel to capture card boundaries
-        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (5, 5))
-        processed = cv2.morphologyEx(edges, cv2.MORPH_CLOSE, kernel)
+        kernel = self._kernel(ctx, (5, 5))
+        processed = cv2.morphologyEx(ctx.edges_low, cv2.MORPH_CLOSE, kernel)
         
-        contours, _ = cv2.findContours(processed, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        
-        for contour in contours:
-            x, y, w, h = cv2.boundingRect(contour)
-            area = w * h
-            aspect_ratio = w / h if h > 0 else 0
-            
-            # Card characteristics: larger rectangular areas
-            if (5000 <= area <= 200000 and 
-                0.3 <= aspect_ratio <= 5.0 and
-                w >= 100 and h >= 100):
-                
-                components.append(ComponentMatch(
-                    component_type="card",
-                    confidence=0.5,
-                    original_bbox=(x, y, w, h),
-                    match_status="detected"
-                ))
+        # Card characteristics: larger rectangular areas
+        candidates = self._box_filter(self._bounding_boxes(processed), 5000, 200000, 0.3, 5.0, min_w=100, min_h=100,
+                                      scale=ctx.scale)
         
-        return components
+        return ComponentSet.from_boxes(candidates, "card", 0.5)
     
-    def _detect_tables(self, image: np.ndarray, gray: np.ndarray) -> List[ComponentMatch]:
+    def _detect_tables(self, ctx: DetectContext) -> ComponentSet:
         """Detect table components"""
-        components = []
-        
-        # Look for grid patterns
-        edges = cv2.Canny(gray, 50, 150)
-        
         # Detect horizontal and vertical lines
-        horizontal_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (40, 1))
-        vertical_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, 40))
+        horizontal_kernel = self._kernel(ctx, (40, 1))
+        vertical_kernel = self._kernel(ctx, (1, 40))
         
-        horizontal_lines = cv2.morphologyEx(edges, cv2.MORPH_OPEN, horizontal_kernel)
-        vertical_lines = cv2.morphologyEx(edges, cv2.MORPH_OPEN, vertical_kernel)
+        horizontal_lines = cv2.morphologyEx(ctx.edges_high, cv2.MORPH_OPEN, horizontal_kernel)
+        vertical_lines = cv2.morphologyEx(ctx.edges_high, cv2.MORPH_OPEN, vertical_kernel)
         
         # Combine lines to find table structure
         table_structure = cv2.bitwise_or(horizontal_lines, vertical_lines)
         
-        contours, _ = cv2.findContours(table_structure, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        boxes = self._bounding_boxes(table_structure)
+        tables = boxes[boxes[:, 2] * boxes[:, 3] * ctx.scale ** 2 >= 15000]  # Large enough to be a table
         
-        for contour in contours:
-            x, y, w, h = cv2.boundingRect(contour)
-            area = w * h
-            
-            if area >= 15000:  # Large enough to be a table
-                components.append(ComponentMatch(
-                    component_type="table",
-                    confidence=0.7,
-                    original_bbox=(x, y, w, h),
-                    match_status="detected"
-                ))
-        
-        return components
+        return ComponentSet.from_boxes(tables, "table", 0.7)
     
-    def _detect_text_elements(self, image: np.ndarray, gray: np.ndarray) -> List[ComponentMatch]:
+    def _detect_text_elements(self, ctx: DetectContext) -> ComponentSet:
         """Detect text/label components"""
-        components = []
-        
-        # Use adaptive threshold for text detection
-        adaptive_thresh = cv2.adaptiveThreshold(
-            gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2
-        )
-        
-        # Invert if needed (text should be black on white)
-        if np.mean(adaptive_thresh) > 127:
-            adaptive_thresh = cv2.bitwise_not(adaptive_thresh)
-        
-        # Find contours
-        contours, _ = cv2.findContours(adaptive_thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        
-        for contour in contours:
-            x, y, w, h = cv2.boundingRect(contour)
-            area = w * h
-            aspect_ratio = w / h if h > 0 else 0
+        # Global Otsu threshold first; it is much cheaper than an adaptive threshold
+        _, binary = cv2.threshold(ctx.gray, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)
+        
+        # Text should be the minority (foreground) class; flip for dark backgrounds
+        foreground = cv2.countNonZero(binary)
+        if foreground > binary.size // 2:
+            binary = cv2.bitwise_not(binary)
+            foreground = binary.size - foreground
+        
+        # Text characteristics: moderate size, not too square
+        candidates = self._box_filter(self._bounding_boxes(binary), 100, 8000, 1.5, 15.0, min_w=20, min_h=8,
+                                      scale=ctx.scale)
+        
+        # Text is sparse, so heavy foreground coverage means solid panels were thresholded
+        # together with the text on them; uneven backgrounds need the adaptive threshold
+        if (len(candidates) < self.min_otsu_text_elements or
+                foreground > binary.size * self.max_otsu_foreground_ratio):
+            adaptive_thresh = cv2.adaptiveThreshold(
+                ctx.gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, max(3, (11 // ctx.scale) | 1), 2
+            )
             
-            # Text characteristics: moderate size, not too square
-            if (100 <= area <= 8000 and 
-                1.5 <= aspect_ratio <= 15.0 and
-                w >= 20 and h >= 8):
-                
-                components.append(ComponentMatch(
-                    component_type="text",
-                    confidence=0.4,
-                    original_bbox=(x, y, w, h),
-                    match_status="detected"
-                ))
+            # Invert if needed (text should be black on white)
+            if cv2.countNonZero(adaptive_thresh) * 255 > adaptive_thresh.size * 127:
+                adaptive_thresh = cv2.bitwise_not(adaptive_thresh)
+            
+            candidates = self._box_filter(self._bounding_boxes(adaptive_thresh), 100, 8000, 1.5, 15.0, min_w=20, min_h=8,
+                                          scale=ctx.scale)
         
-        return components
+        return ComponentSet.from_boxes(candidates, "text", 0.4)
     
-    def _merge_overlapping_components(self, components: List[ComponentMatch]) -> List[ComponentMatch]:
+    def _merge_overlapping_components(self, components: ComponentSet) -> ComponentSet:
         """Merge overlapping component detections"""
-        if not components:
+        if not len(components):
             return components
         
-        merged = []
-        used = set()
+        # Bucket each box into every grid cell it covers. Intersecting boxes always
+        # share a cell, so only boxes in the same (type, cell) bucket need an IoU test
+        bboxes = components.bboxes.tolist()
+        types = components.types.tolist()
+        grid = defaultdict(list)
+        for idx, (type_id, bbox) in enumerate(zip(types, bboxes)):
+            for cell in self._grid_cells(bbox):
+                grid[(type_id, cell)].append(idx)
         
-        for i, comp1 in enumerate(components):
-            if i in used:
-                continue
-            
-            bbox1 = comp1.original_bbox or comp1.live_bbox
-            if not bbox1:
+        keep = []
+        used = np.zeros(len(components), dtype=bool)
+        
+        for i, (type_id, bbox1) in enumerate(zip(types, bboxes)):
+            if used[i]:
                 continue
             
             # Find overlapping components of the same type
-            overlapping = [comp1]
-            used.add(i)
+            overlapping = [i]
+            used[i] = True
             
-            for j, comp2 in enumerate(components[i+1:], i+1):
-                if j in used or comp2.component_type != comp1.component_type:
-                    continue
-                
-                bbox2 = comp2.original_bbox or comp2.live_bbox
-                if not bbox2:
-                    continue
-                
-                if self._boxes_overlap(bbox1, bbox2, threshold=0.3):
-                    overlapping.append(comp2)
-                    used.add(j)
+            candidates = set()
+            for cell in self._grid_cells(bbox1):
+                candidates.update(grid.get((type_id, cell), ()))
+            candidates = np.array(sorted(j for j in candidates if j > i), dtype=np.intp)
+            candidates = candidates[~used[candidates]]
+            
+            if len(candidates):
+                hits = candidates[self._boxes_overlap(components.bboxes[i], components.bboxes[candidates], threshold=0.3)]
+                overlapping.extend(hits.tolist())
+                used[hits] = True
             
             # Keep the component with highest confidence
-            best_component = max(overlapping, key=lambda c: c.confidence)
-            merged.append(best_component)
+            keep.append(overlapping[int(np.argmax(components.confidence[overlapping]))])
         
-        return merged
+        return components.subset(keep)
     
-    def _boxes_overlap(self, bbox1: Tuple[int, int, int, int], bbox2: Tuple[int, int, int, int], threshold: float = 0.3) -> bool:
-        """Check if two bounding boxes overlap significantly"""
-        x1, y1, w1, h1 = bbox1
-        x2, y2, w2, h2 = bbox2
+    def _grid_cells(self, bbox: Tuple[int, int, int, int]):
+        """Yield the merge-grid cells covered by a bounding box"""
+        x, y, w, h = bbox
+        cell = self.merge_grid_cell_size
+        for cx in range(x // cell, (x + w - 1) // cell + 1):
+            for cy in range(y // cell, (y + h - 1) // cell + 1):
+                yield cx, cy
+    
+    def _boxes_overlap(self, bbox: np.ndarray, boxes: np.ndarray, threshold: float = 0.3) -> np.ndarray:
+        """Check which of the (N, 4) boxes overlap bbox significantly"""
+        x1, y1, w1, h1 = bbox
+        x2, y2, w2, h2 = boxes.T
         
         # Calculate intersection
-        left = max(x1, x2)
-        top = max(y1, y2)
-        right = min(x1 + w1, x2 + w2)
-        bottom = min(y1 + h1, y2 + h2)
-        
-        if left < right and top < bottom:
-            intersection_area = (right - left) * (bottom - top)
-            area1 = w1 * h1
-            area2 = w2 * h2
-            
-            # Calculate IoU (Intersection over Union)
-            union_area = area1 + area2 - intersection_area
-            iou = intersection_area / union_area if union_area > 0 else 0
-            
-            return iou >= threshold
-        
-        return False
+        left = np.maximum(x1, x2)
+        top = np.maximum(y1, y2)
+        right = np.minimum(x1 + w1, x2 + w2)
+        bottom = np.minimum(y1 + h1, y2 + h2)
+        intersects = (left < right) & (top < bottom)
+        intersection_area = np.where(intersects, (right - left) * (bottom - top), 0)
+        
+        # Calculate IoU (Intersection over Union)
+        union_area = w1 * h1 + w2 * h2 - intersection_area
+        iou = np.divide(intersection_area, union_area, out=np.zeros(len(boxes)), where=union_area > 0)
+        
+        return intersects & (iou >= threshold)
     
     def compare_components(self, original_components: List[ComponentMatch], live_components: List[ComponentMatch]) -> Dict[str, Any]:
         """Compare components between original and live images to detect anomalies"""
@@ -363,46 +423,18 @@ class ComponentAnomalyDetector:
             "summary": {}
         }
         
-        # Count components by type
-        original_counts = {}
-        live_counts = {}
-        
-        for comp in original_components:
-            original_counts[comp.component_type] = original_counts.get(comp.component_type, 0) + 1
-        
-        for comp in live_components:
-            live_counts[comp.component_type] = live_counts.get(comp.component_type, 0) + 1
-        
         # Find matches between original and live components
+        original_set = ComponentSet.from_matches(original_components)
+        live_set = ComponentSet.from_matches(live_components, prefer_live_bbox=True)
+        matches = self._match_components(original_set, live_set)
         matched_pairs = []
         used_live = set()
         
-        for orig_comp in original_components:
-            best_match = None
-            best_score = 0
-            best_idx = -1
-            
-            orig_bbox = orig_comp.original_bbox
-            
-            for i, live_comp in enumerate(live_components):
-                if i in used_live or live_comp.component_type != orig_comp.component_type:
-                    continue
-                
-                live_bbox = live_comp.live_bbox or live_comp.original_bbox
-                
-                # Calculate similarity score
-                position_score = self._calculate_position_similarity(orig_bbox, live_bbox)
-                size_score = self._calculate_size_similarity(orig_bbox, live_bbox)
-                
-                total_score = (position_score * 0.7 + size_score * 0.3)
-                
-                if total_score > best_score and total_score > self.similarity_threshold:
-                    best_match = live_comp
-                    best_score = total_score
-                    best_idx = i
-            
-            if best_match:
+        for orig_idx, orig_comp in enumerate(original_components):
+            if orig_idx in matches:
                 # Component found
+                live_idx, best_score = matches[orig_idx]
+                best_match = live_components[live_idx]
                 orig_comp.live_bbox = best_match.live_bbox or best_match.original_bbox
                 orig_comp.match_status = "found"
                 orig_comp.similarity_score = best_score
@@ -412,7 +444,7 @@ class ComponentAnomalyDetector:
                     anomalies["modified_components"].append(orig_comp)
                 
                 matched_pairs.append((orig_comp, best_match))
-                used_live.add(best_idx)
+                used_live.add(live_idx)
             else:
                 # Component missing
                 orig_comp.match_status = "missing"
@@ -424,17 +456,20 @@ class ComponentAnomalyDetector:
                 live_comp.match_status = "extra"
                 anomalies["extra_components"].append(live_comp)
         
-        # Generate component breakdown
-        all_types = set(original_counts.keys()) | set(live_counts.keys())
-        for comp_type in all_types:
-            orig_count = original_counts.get(comp_type, 0)
-            live_count = live_counts.get(comp_type, 0)
-            
+        # Generate component breakdown from per-type counts on both sides
+        orig_counts = np.bincount(original_set.types, minlength=len(COMPONENT_TYPES))
+        live_counts = np.bincount(live_set.types, minlength=len(COMPONENT_TYPES))
+        accuracy = np.minimum(orig_counts, live_counts) / np.maximum(np.maximum(orig_counts, live_counts), 1) * 100
+        
+        present = [type_id for type_id in BREAKDOWN_ORDER if orig_counts[type_id] or live_counts[type_id]]
+        all_types = [COMPONENT_TYPES[type_id] for type_id in present]
+        for comp_type, orig_count, live_count, type_accuracy in zip(
+                all_types, orig_counts[present].tolist(), live_counts[present].tolist(), accuracy[present].tolist()):
             anomalies["component_breakdown"][comp_type] = {
                 "original_count": orig_count,
                 "live_count": live_count,
                 "difference": live_count - orig_count,
-                "accuracy": min(orig_count, live_count) / max(orig_count, live_count, 1) * 100
+                "accuracy": type_accuracy
             }
         
         # Generate summary
@@ -461,39 +496,62 @@ class ComponentAnomalyDetector:
         
         return anomalies
     
-    def _calculate_position_similarity(self, bbox1: Tuple[int, int, int, int], bbox2: Tuple[int, int, int, int]) -> float:
-        """Calculate position similarity between two bounding boxes"""
-        x1, y1, w1, h1 = bbox1
-        x2, y2, w2, h2 = bbox2
-        
-        # Calculate center points
-        center1 = (x1 + w1/2, y1 + h1/2)
-        center2 = (x2 + w2/2, y2 + h2/2)
-        
-        # Calculate distance between centers
-        distance = np.sqrt((center1[0] - center2[0])**2 + (center1[1] - center2[1])**2)
-        
-        # Normalize distance
-        max_distance = self.position_tolerance * 2
-        position_score = max(0, 1 - (distance / max_distance))
+    def _match_components(self, original_set: ComponentSet, live_set: ComponentSet) -> Dict[int, Tuple[int, float]]:
+        """Match original to live components per type, returning {orig_idx: (live_idx, score)}"""
+        matches = {}
+        for comp_type in np.unique(original_set.types).tolist():
+            orig_indices = np.flatnonzero(original_set.types == comp_type)
+            live_indices = np.flatnonzero(live_set.types == comp_type)
+            if not len(live_indices):
+                continue
+            
+            original = original_set.bboxes[orig_indices].astype(np.float64)
+            live = live_set.bboxes[live_indices].astype(np.float64)
+            scores = self._similarity_matrix(original, live)
+            eligible = scores > self.similarity_threshold
+            
+            if SCIPY_AVAILABLE:
+                # Globally optimal assignment; ineligible pairs cost nothing and are dropped below
+                rows, cols = linear_sum_assignment(np.where(eligible, -scores, 0.0))
+                pairs = [(r, c) for r, c in zip(rows, cols) if eligible[r, c]]
+            else:
+                # Greedy best match per original component, in detection order
+                pairs = []
+                available = np.ones(len(live_indices), dtype=bool)
+                for r in range(len(orig_indices)):
+                    candidates = np.where(eligible[r] & available, scores[r], -np.inf)
+                    c = int(np.argmax(candidates))
+                    if np.isfinite(candidates[c]):
+                        pairs.append((r, c))
+                        available[c] = False
+            
+            for r, c in pairs:
+                matches[int(orig_indices[r])] = (int(live_indices[c]), float(scores[r, c]))
         
-        return position_score
+        return matches
     
-    def _calculate_size_similarity(self, bbox1: Tuple[int, int, int, int], bbox2: Tuple[int, int, int, int]) -> float:
-        """Calculate size similarity between two bounding boxes"""
-        x1, y1, w1, h1 = bbox1
-        x2, y2, w2, h2 = bbox2
-        
-        area1 = w1 * h1
-        area2 = w2 * h2
-        
-        if area1 == 0 or area2 == 0:
-            return 0
-        
-        # Calculate size ratio
-        size_ratio = min(area1, area2) / max(area1, area2)
-        
-        return size_ratio
+    def _similarity_matrix(self, original: np.ndarray, live: np.ndarray) -> np.ndarray:
+        """Pairwise position/size similarity between (N, 4) and (M, 4) bbox arrays"""
+        original_centers = original[:, :2] + original[:, 2:] / 2
+        live_centers = live[:, :2] + live[:, 2:] / 2
+        offsets = original_centers[:, None, :] - live_centers[None, :, :]
+        squared_distance = np.einsum("ijk,ijk->ij", offsets, offsets)
+        
+        # Even an identical size cannot lift pairs beyond this distance over the similarity
+        # threshold, so gate on squared distance and only take square roots for the rest
+        max_distance = self.position_tolerance * 2
+        reachable_distance = max_distance * (1 - max(self.similarity_threshold - 0.3, 0) / 0.7)
+        reachable = squared_distance < reachable_distance ** 2
+        position = np.zeros_like(squared_distance)
+        position[reachable] = np.maximum(0, 1 - np.sqrt(squared_distance[reachable]) / max_distance)
+        
+        original_area = (original[:, 2] * original[:, 3])[:, None]
+        live_area = (live[:, 2] * live[:, 3])[None, :]
+        smaller = np.minimum(original_area, live_area)
+        larger = np.maximum(original_area, live_area)
+        size = np.divide(smaller, larger, out=np.zeros_like(smaller * larger), where=smaller > 0)
+        
+        return position * 0.7 + size * 0.3
     
     def generate_anomaly_report(self, anomalies: Dict[str, Any]) -> str:
         """Generate a detailed anomaly report"""
@@ -520,15 +578,13 @@ class ComponentAnomalyDetector:
         # Detailed anomalies
         if anomalies["missing_components"]:
             report.append(f"\n❌ Missing Components ({len(anomalies['missing_components'])}):")
-            for comp in anomalies["missing_components"]:
-                bbox = comp.original_bbox
-                report.append(f"   • {comp.component_type.title()} at ({bbox[0]}, {bbox[1]}) - {bbox[2]}x{bbox[3]}")
+            report.extend(self._format_component_lines(
+                (comp.component_type, comp.original_bbox) for comp in anomalies["missing_components"]))
         
         if anomalies["extra_components"]:
             report.append(f"\n➕ Extra Components ({len(anomalies['extra_components'])}):")
-            for comp in anomalies["extra_components"]:
-                bbox = comp.live_bbox or comp.original_bbox
-                report.append(f"   • {comp.component_type.title()} at ({bbox[0]}, {bbox[1]}) - {bbox[2]}x{bbox[3]}")
+            report.extend(self._format_component_lines(
+                (comp.component_type, comp.live_bbox or comp.original_bbox) for comp in anomalies["extra_components"]))
         
         if anomalies["modified_components"]:
             report.append(f"\n🔄 Modified Components ({len(anomalies['modified_components'])}):")
@@ -541,3 +597,8 @@ class ComponentAnomalyDetector:
                     report.append(f"     Live: ({live_bbox[0]}, {live_bbox[1]}) - {live_bbox[2]}x{live_bbox[3]}")
         
         return "\n".join(report)
+    
+    @staticmethod
+    def _format_component_lines(entries) -> List[str]:
+        """Format (component_type, bbox) pairs as report bullet lines"""
+        return [f"   • {t.title()} at ({x}, {y}) - {w}x{h}" for t, (x, y, w, h) in entries]
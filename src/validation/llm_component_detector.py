@@ -6,12 +6,43 @@ Uses vision-language models for intelligent UI component analysis
 import cv2
 import numpy as np
 import base64
+import hashlib
+import importlib.util
+import inspect
 import json
+import os
+import random
+import sqlite3
+import string
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Dict, List, Any, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
+from functools import lru_cache
 import openai
-from PIL import Image
-import io
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def dumps_json(data: Any, indent: bool = False) -> str:
+    """Serialize to JSON with orjson when it is installed (compact unless indent is set)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)).decode("utf-8")
+    if indent:
+        return json.dumps(data, indent=2, default=str)
+    return json.dumps(data, separators=(",", ":"), default=str)
+
+def loads_json(text: str) -> Any:
+    """Parse JSON with orjson when it is installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(text)
+    return json.loads(text)
 
 @dataclass
 class LLMComponentMatch:
@@ -24,57 +55,250 @@ class LLMComponentMatch:
     accessibility_notes: str
     match_status: str = "detected"
 
-class LLMComponentDetector:
-    """LLM-powered component detection and analysis"""
+# Sized for batch runs; every detector in the process shares this one pool
+OPENAI_MAX_CONNECTIONS = 32
+
+@lru_cache(maxsize=1)
+def shared_openai_client() -> "openai.OpenAI":
+    """Process-wide OpenAI client, so detectors reuse warm keep-alive connections (HTTP/2 when h2 is installed)"""
+    import httpx  # Always present: the openai SDK is built on it
     
-    def __init__(self, model: str = "gpt-4o"):
-        self.model = model
-        self.client = openai.OpenAI()
-        
-    def analyze_components(self, image: np.ndarray, image_type: str = "screenshot") -> List[LLMComponentMatch]:
-        """Use LLM to analyze and detect UI components"""
-        print(f"🧠 LLM analyzing {image_type} for UI components...")
-        
-        # Convert image to base64 for LLM
-        image_b64 = self._image_to_base64(image)
-        
-        # Create analysis prompt
-        prompt = self._create_analysis_prompt(image_type)
-        
+    http_client = httpx.Client(
+        http2=importlib.util.find_spec("h2") is not None,
+        limits=httpx.Limits(max_connections=OPENAI_MAX_CONNECTIONS, max_keepalive_connections=OPENAI_MAX_CONNECTIONS),
+        timeout=httpx.Timeout(600.0, connect=5.0),
+    )
+    # Retries belong to _create_completion, behind the shared rate limiter; SDK-level
+    # retries would re-send 429s outside it
+    return openai.OpenAI(http_client=http_client, max_retries=0)
+
+class RateLimiter:
+    """Thread-safe token bucket: at most `rate` acquisitions per `period` seconds, with bursts up to `rate`"""
+    
+    def __init__(self, rate: int, period: float = 60.0):
+        self.rate = rate
+        self.period = period
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate / self.period)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) * self.period / self.rate
+            time.sleep(wait)
+
+# Shared by every detector in the process (they share one client too), so
+# concurrent batch cases stay under the account's request ceiling instead of
+# triggering 429 storms
+LLM_REQUESTS_PER_MINUTE = int(os.getenv("LLM_REQUESTS_PER_MINUTE", "60"))
+LLM_MAX_CONCURRENT_REQUESTS = int(os.getenv("LLM_MAX_CONCURRENT_REQUESTS", "8"))
+LLM_MAX_ATTEMPTS = 5
+LLM_RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.InternalServerError,
+)
+_llm_rate_limiter = RateLimiter(LLM_REQUESTS_PER_MINUTE)
+_llm_request_slots = threading.BoundedSemaphore(LLM_MAX_CONCURRENT_REQUESTS)
+
+# Analyses currently being requested, keyed like the response cache, so concurrent
+# callers with the same image wait for one API call instead of each making it
+_inflight_analyses: Dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+
+class SlotHeldStream:
+    """Iterate a streamed response, releasing its request slot once the stream ends or is dropped"""
+    
+    def __init__(self, stream):
+        self._stream = stream
+        self._released = False
+    
+    def __iter__(self):
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {"type": "text", "text": prompt},
-                            {
-                                "type": "image_url",
-                                "image_url": {"url": f"data:image/png;base64,{image_b64}"}
-                            }
-                        ]
-                    }
-                ],
-                max_tokens=2000,
-                temperature=0.1
+            yield from self._stream
+        finally:
+            self.close()
+    
+    def close(self):
+        if self._released:
+            return
+        self._released = True
+        _llm_request_slots.release()
+        close_stream = getattr(self._stream, "close", None)
+        if close_stream is not None:
+            close_stream()
+    
+    def __del__(self):
+        # Covers streams that are never iterated
+        self.close()
+
+@lru_cache(maxsize=None)
+def _supports_stream_options(completions_type: type) -> bool:
+    """Older openai SDKs raise TypeError on stream_options instead of ignoring it"""
+    try:
+        return "stream_options" in inspect.signature(completions_type.create).parameters
+    except (AttributeError, TypeError, ValueError):
+        return False
+
+def iter_json_blocks(text: str, opener: str = "{"):
+    """Yield balanced JSON object/array candidates in text, earliest first
+    
+    Single pass per candidate that tracks string and escape state, so brackets
+    inside string values (e.g. "array [0]") and prose after the JSON are handled.
+    Callers try each candidate until one parses, which skips stray brackets in
+    any prose before the JSON.
+    """
+    closer = "}" if opener == "{" else "]"
+    start = text.find(opener)
+    
+    while start != -1:
+        depth = 0
+        in_string = False
+        escaped = False
+        for index in range(start, len(text)):
+            char = text[index]
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char == opener:
+                depth += 1
+            elif char == closer:
+                depth -= 1
+                if depth == 0:
+                    yield text[start:index + 1]
+                    break
+        else:
+            return  # Unbalanced from here on, e.g. a truncated response
+        
+        # Resume after the block: a fragment nested inside one that failed to parse is not the answer
+        start = text.find(opener, index + 1)
+
+def perceptual_hash(image: np.ndarray) -> int:
+    """64-bit DCT perceptual hash (pHash) of an image"""
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    small = cv2.resize(gray, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low_freq = cv2.dct(small)[:8, :8].flatten()
+    bits = low_freq > np.median(low_freq[1:])
+    return int(np.packbits(bits).view(">u8")[0])
+
+class LLMResponseCache:
+    """SQLite-backed cache of LLM component analyses, keyed on exact image content
+    
+    An optional pHash near-match (max_hamming_distance > 0) only applies to
+    "original" reference designs: a missing component barely moves the pHash, so
+    near-matching live screenshots would hide exactly the regressions we look for.
+    """
+    
+    NEAR_MATCH_IMAGE_TYPES = {"original"}
+    
+    def __init__(self, db_path: str = None, max_hamming_distance: int = 0):
+        self.db_path = db_path or os.getenv(
+            "LLM_RESPONSE_CACHE_DB", os.path.join(tempfile.gettempdir(), "llm_component_cache.db")
+        )
+        self.max_hamming_distance = max_hamming_distance
+        self._execute("PRAGMA journal_mode=WAL")
+        self._execute(
+            """
+            CREATE TABLE IF NOT EXISTS component_analysis (
+                cache_key TEXT PRIMARY KEY,
+                scope TEXT NOT NULL,
+                phash INTEGER NOT NULL,
+                components TEXT NOT NULL
             )
-            
-            # Parse LLM response
-            components = self._parse_llm_response(response.choices[0].message.content)
-            
-            print(f"✅ LLM detected {len(components)} components")
-            return components
-            
-        except Exception as e:
-            print(f"❌ LLM analysis failed: {e}")
+            """
+        )
+        self._execute("CREATE INDEX IF NOT EXISTS idx_component_analysis_scope ON component_analysis (scope)")
+    
+    def _execute(self, sql: str, params: tuple = ()) -> List[tuple]:
+        # Short-lived connections keep the cache safe to use from worker threads
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=5)
+        except sqlite3.Error as e:
+            print(f"⚠️ LLM response cache unavailable: {e}")
             return []
+        try:
+            with conn:
+                return conn.execute(sql, params).fetchall()
+        except sqlite3.Error as e:
+            # A broken cache must never fail the analysis itself
+            print(f"⚠️ LLM response cache unavailable: {e}")
+            return []
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def _scope(image: np.ndarray, image_type: str, model: str) -> str:
+        # Near matches only make sense for the same prompt, model and pixel grid (bboxes are in pixels)
+        return f"{model}|{ANALYSIS_PROMPT_DIGEST}|{image_type}|{'x'.join(map(str, image.shape))}"
     
-    def _create_analysis_prompt(self, image_type: str) -> str:
-        """Create detailed prompt for LLM component analysis"""
+    @staticmethod
+    def make_key(image: np.ndarray, image_type: str, model: str) -> str:
+        digest = hashlib.sha256(np.ascontiguousarray(image).data)
+        digest.update(LLMResponseCache._scope(image, image_type, model).encode("utf-8"))
+        return digest.hexdigest()
+    
+    def get(self, image: np.ndarray, image_type: str, model: str) -> List["LLMComponentMatch"]:
+        """Return cached components for an identical (or, if enabled, near-identical original) image, else None"""
+        rows = self._execute(
+            "SELECT components FROM component_analysis WHERE cache_key = ?",
+            (self.make_key(image, image_type, model),),
+        )
+        if not rows and self.max_hamming_distance > 0 and image_type in self.NEAR_MATCH_IMAGE_TYPES:
+            target = perceptual_hash(image)
+            best_distance = self.max_hamming_distance + 1
+            for phash, components in self._execute(
+                "SELECT phash, components FROM component_analysis WHERE scope = ?",
+                (self._scope(image, image_type, model),),
+            ):
+                distance = bin((phash & 0xFFFFFFFFFFFFFFFF) ^ target).count("1")
+                if distance < best_distance:
+                    best_distance, rows = distance, [(components,)]
         
-        return f"""
-Analyze this {image_type} and identify all UI components with their exact locations and properties.
+        # Empty analyses are never worth serving (older cache files may hold some)
+        components = loads_json(rows[0][0]) if rows else None
+        if not components:
+            return None
+        return [
+            LLMComponentMatch(**{**comp, "bbox": tuple(comp["bbox"])})
+            for comp in components
+        ]
+    
+    def set(self, image: np.ndarray, image_type: str, model: str, components: List["LLMComponentMatch"]):
+        phash = perceptual_hash(image)
+        # SQLite integers are signed 64-bit
+        if phash >= 1 << 63:
+            phash -= 1 << 64
+        self._execute(
+            "INSERT OR REPLACE INTO component_analysis (cache_key, scope, phash, components) VALUES (?, ?, ?, ?)",
+            (
+                self.make_key(image, image_type, model),
+                self._scope(image, image_type, model),
+                phash,
+                # orjson serializes dataclasses natively, skipping asdict's recursive deep copy
+                dumps_json(components if ORJSON_AVAILABLE else [asdict(comp) for comp in components]),
+            ),
+        )
+
+# Static instructions go first (as the system message) so every analysis call
+# shares a byte-identical prefix that OpenAI's automatic prompt caching can reuse;
+# the per-call image type, image and component lists come after it.
+ANALYSIS_INSTRUCTIONS = """
+You are a UI analysis engine. You receive one screenshot of a web application and
+identify all UI components with their exact locations and properties.
 
 For each component you find, provide:
 1. Component type (button, input, navigation, table, card, text, image, etc.)
@@ -85,23 +309,74 @@ For each component you find, provide:
 6. Visual attributes (color, size, style)
 7. Accessibility considerations
 
+Field reference:
+- component_type: one lowercase word from this vocabulary where possible:
+  button, link, input, textarea, select, checkbox, radio, toggle, slider,
+  navigation, menu, tab, breadcrumb, pagination, table, list, card, modal,
+  header, footer, sidebar, form, text, heading, label, icon, image, logo,
+  avatar, badge, chip, tooltip, progress, chart. Use "unknown" only when no
+  term applies.
+- description: one sentence naming the visible text or purpose of the component.
+- confidence: your certainty that the component exists with this type and box,
+  from 0.0 to 1.0. Use values below 0.5 for partially visible or ambiguous
+  elements instead of leaving them out.
+- bbox: [x, y, width, height] in pixels of the image as provided. The origin is
+  the top-left corner, x grows to the right and y grows downwards. The box must
+  tightly enclose the visible component, including its border and padding but
+  not surrounding whitespace. All four values are integers.
+- functionality: what happens when a user interacts with the component, or what
+  information it conveys if it is not interactive.
+- visual_attributes: an object with short string values. Use the keys
+  background_color, text_color, border_radius, size and font_weight when they
+  apply, and add other keys only for distinctive styling.
+- accessibility_notes: contrast, labelling, focus visibility, touch target size
+  or other accessibility observations. Use an empty string when nothing stands out.
+
 Return your analysis as a JSON array with this structure:
 ```json
 [
-  {{
+  {
     "component_type": "button",
     "description": "Primary action button with 'Submit' text",
     "confidence": 0.95,
     "bbox": [100, 200, 120, 40],
     "functionality": "Submits form data when clicked",
-    "visual_attributes": {{
+    "visual_attributes": {
       "background_color": "blue",
       "text_color": "white",
       "border_radius": "rounded",
       "size": "medium"
-    }},
+    },
     "accessibility_notes": "Has proper contrast ratio, needs aria-label"
-  }}
+  },
+  {
+    "component_type": "input",
+    "description": "Email address text field with placeholder 'you@example.com'",
+    "confidence": 0.9,
+    "bbox": [100, 140, 320, 36],
+    "functionality": "Accepts the user's email address for sign-in",
+    "visual_attributes": {
+      "background_color": "white",
+      "text_color": "gray",
+      "border_radius": "slightly rounded",
+      "size": "large"
+    },
+    "accessibility_notes": "Placeholder used instead of a visible label"
+  },
+  {
+    "component_type": "navigation",
+    "description": "Top navigation bar with links 'Home', 'Reports' and 'Settings'",
+    "confidence": 0.92,
+    "bbox": [0, 0, 1280, 64],
+    "functionality": "Switches between the main sections of the application",
+    "visual_attributes": {
+      "background_color": "dark blue",
+      "text_color": "white",
+      "border_radius": "none",
+      "size": "full width"
+    },
+    "accessibility_notes": "Active link is indicated by colour only"
+  }
 ]
 ```
 
@@ -112,77 +387,512 @@ Focus on:
 - Content sections (headers, sidebars, main content)
 - Form elements (inputs, checkboxes, radio buttons)
 
+Rules:
+- Report every distinct component once. A container (card, form, table) and the
+  components inside it are reported separately.
+- Do not merge repeated items such as menu entries or table rows into a single
+  component unless they are indistinguishable.
+- Check that every bbox lies inside the image and that width and height are
+  positive; clip boxes at the image border rather than extending past it.
+- Respond with the JSON array only, with no commentary before or after it.
+
 Be precise with bounding box coordinates and comprehensive in your analysis.
 """
+
+COMPARISON_INSTRUCTIONS = """
+You compare two sets of UI components, ORIGINAL (from the design) and LIVE (from
+the deployed application), and identify anomalies.
+
+Analyze and return a JSON response with:
+1. missing_components: Components in original but not in live
+2. extra_components: Components in live but not in original
+3. modified_components: Components that exist in both but have changed
+4. position_changes: Components that moved significantly
+5. functionality_changes: Components with different behavior
+6. accessibility_issues: New accessibility problems
+7. overall_assessment: Summary of changes and their impact
+
+For each anomaly, provide:
+- component_type
+- description of the change
+- severity (low/medium/high)
+- recommendation for fixing
+
+Focus on:
+- Functional equivalence (same purpose, different implementation)
+- Layout preservation (components in similar positions)
+- User experience impact (missing critical features)
+- Accessibility compliance (proper labeling, contrast)
+
+Return as valid JSON.
+"""
+
+# Appended to ANALYSIS_INSTRUCTIONS for the single-call analyze-and-compare path,
+# so that call still shares the cached analysis prefix
+COMBINED_INSTRUCTIONS = """
+Two-screenshot mode: when you receive two screenshots, the first is ORIGINAL (the
+design) and the second is LIVE (the deployed application). Analyze both with the
+rules above, then compare them. This replaces the single-array output rule:
+respond with one JSON object only, with no commentary before or after it:
+{
+  "original": [components of the first screenshot],
+  "live": [components of the second screenshot],
+  "comparison": {
+    "missing_components": [...],
+    "extra_components": [...],
+    "modified_components": [...],
+    "position_changes": [...],
+    "functionality_changes": [...],
+    "accessibility_issues": [...],
+    "overall_assessment": "summary of changes and their impact"
+  }
+}
+Each comparison entry has component_type, description of the change, severity
+(low/medium/high) and a recommendation for fixing. Bounding boxes are in pixels
+of the screenshot they belong to.
+"""
+
+# Cached analyses are only valid for the instructions that produced them
+ANALYSIS_PROMPT_DIGEST = hashlib.sha256(ANALYSIS_INSTRUCTIONS.encode("utf-8")).hexdigest()[:12]
+
+# Per-call prompt parts are filled in from these; the static instructions above
+# go in the system message so every request shares an identical prefix
+ANALYSIS_PROMPT_TEMPLATE = string.Template(
+    "Analyze this $image_type and identify all UI components with their exact locations and properties."
+)
+
+COMPARISON_PROMPT_TEMPLATE = """
+ORIGINAL COMPONENTS:
+%s
+
+LIVE COMPONENTS:
+%s
+"""
+
+REPORT_INSTRUCTIONS = """
+Generate a comprehensive UI component analysis report from the data you are given.
+
+Create a professional report with:
+
+1. EXECUTIVE SUMMARY
+   - Overall accuracy assessment
+   - Key findings and impact
+   
+2. COMPONENT BREAKDOWN
+   - Missing functionality
+   - Added features
+   - Modified elements
+   
+3. USER EXPERIENCE IMPACT
+   - Critical issues affecting usability
+   - Accessibility concerns
+   - Performance implications
+   
+4. RECOMMENDATIONS
+   - Priority fixes
+   - Enhancement opportunities
+   - Best practices
+
+5. TECHNICAL DETAILS
+   - Specific component changes
+   - Implementation notes
+
+Format as markdown with clear sections and actionable insights.
+"""
+
+REPORT_PROMPT_TEMPLATE = """
+COMPONENT ANALYSIS:
+- Original components: %d
+- Live components: %d
+
+COMPARISON RESULTS:
+%s
+"""
+
+# Files in these formats can be sent to the model as-is
+ENCODED_IMAGE_MIME_TYPES = {".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".png": "image/png"}
+
+class LLMComponentDetector:
+    """LLM-powered component detection and analysis"""
     
-    def _image_to_base64(self, image: np.ndarray) -> str:
-        """Convert OpenCV image to base64 string"""
+    def __init__(self, model: str = "gpt-4o", cache: LLMResponseCache = None, use_cache: bool = True):
+        self.model = model
+        self.client = shared_openai_client()
+        self.jpeg_quality = 85
+        self.max_image_side = 1536  # Longest edge sent to the model; fewer vision tiles/tokens
+        self.cache = cache if cache is not None else (LLMResponseCache() if use_cache else None)
+        self.comparison_cache_size = 64
+        self._comparison_cache = OrderedDict()  # (original fingerprint, live fingerprint) -> comparison
+        self._comparison_cache_lock = threading.Lock()
+        self.token_usage = {"input": 0, "output": 0}  # Billed tokens reported by the API, for carbon accounting
+        self._usage_lock = threading.Lock()
+        
+    def analyze_components(self, image: np.ndarray, image_type: str = "screenshot",
+                           image_path: str = None) -> List[LLMComponentMatch]:
+        """Use LLM to analyze and detect UI components
         
-        # Convert BGR to RGB
-        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        image_path, when it is the JPEG/PNG file `image` was read from, lets the
+        original bytes be sent without a re-encode.
+        """
+        print(f"🧠 LLM analyzing {image_type} for UI components...")
+        
+        if self.cache is not None:
+            cached = self.cache.get(image, image_type, self.model)
+            if cached is not None:
+                print(f"✅ LLM cache hit: {len(cached)} components")
+                return cached
         
-        # Convert to PIL Image
-        pil_image = Image.fromarray(image_rgb)
+        key = LLMResponseCache.make_key(image, image_type, self.model)
+        with _inflight_lock:
+            future = _inflight_analyses.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = _inflight_analyses[key] = Future()
         
-        # Convert to base64
-        buffer = io.BytesIO()
-        pil_image.save(buffer, format="PNG")
-        image_b64 = base64.b64encode(buffer.getvalue()).decode()
+        if not is_owner:
+            print(f"⏳ Identical {image_type} analysis already in flight, waiting for it")
+            return future.result()
         
-        return image_b64
+        try:
+            components = self._request_components(image, image_type, image_path)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(components)
+        finally:
+            with _inflight_lock:
+                del _inflight_analyses[key]
+        
+        return components
     
-    def _parse_llm_response(self, response_text: str) -> List[LLMComponentMatch]:
-        """Parse LLM response into component matches"""
+    def _request_components(self, image: np.ndarray, image_type: str, image_path: str = None) -> List[LLMComponentMatch]:
+        """Run the analysis API call for an image that is not cached"""
         
-        components = []
+        # Convert image to base64 for LLM (downscaled; bboxes are mapped back when parsing)
+        image_url, scale = self._prepare_image(image, image_path)
+        
+        # Create analysis prompt
+        prompt = self._create_analysis_prompt(image_type)
         
         try:
-            # Extract JSON from response
-            start_idx = response_text.find('[')
-            end_idx = response_text.rfind(']') + 1
+            response = self._create_completion(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": ANALYSIS_INSTRUCTIONS},
+                    {
+                        "role": "user",
+                        "content": [
+                            {"type": "text", "text": prompt},
+                            {
+                                "type": "image_url",
+                                "image_url": {"url": image_url}
+                            }
+                        ]
+                    }
+                ],
+                max_tokens=2000,
+                temperature=0.1,
+                stream=True,
+                **self._stream_usage_options()
+            )
             
-            if start_idx == -1 or end_idx == 0:
-                print("❌ No valid JSON found in LLM response")
-                return components
+            # Parse components as the response streams in instead of after the full body
+            stream_state = {}
+            chunks = (
+                chunk.choices[0].delta.content
+                for chunk in self._track_stream_usage(response, stream_state)
+                if chunk.choices and chunk.choices[0].delta.content
+            )
+            components = self._parse_llm_response(chunks, scale)
             
-            json_str = response_text[start_idx:end_idx]
-            component_data = json.loads(json_str)
+            # Only complete, non-empty answers are worth persisting; a refusal or a
+            # truncated stream would otherwise be served as a cache hit on every run
+            if self.cache is not None and components and stream_state.get("finish_reason") == "stop":
+                self.cache.set(image, image_type, self.model, components)
             
-            for comp in component_data:
-                try:
-                    component = LLMComponentMatch(
-                        component_type=comp.get("component_type", "unknown"),
-                        description=comp.get("description", ""),
-                        confidence=float(comp.get("confidence", 0.0)),
-                        bbox=tuple(comp.get("bbox", [0, 0, 0, 0])),
-                        functionality=comp.get("functionality", ""),
-                        visual_attributes=comp.get("visual_attributes", {}),
-                        accessibility_notes=comp.get("accessibility_notes", "")
-                    )
-                    components.append(component)
-                    
-                except Exception as e:
-                    print(f"⚠️ Failed to parse component: {e}")
-                    continue
+            print(f"✅ LLM detected {len(components)} components")
+            return components
+            
+        except Exception as e:
+            print(f"❌ LLM analysis failed: {e}")
+            return []
+    
+    def analyze_and_compare(self, original_img: np.ndarray, live_img: np.ndarray,
+                            original_path: str = None, live_path: str = None):
+        """Analyze and compare both screenshots in one multi-image LLM call
+        
+        Returns (original_components, live_components, comparison) or None if the
+        combined call fails, in which case callers fall back to separate calls.
+        """
+        if self.cache is not None:
+            original_cached = self.cache.get(original_img, "original", self.model)
+            live_cached = self.cache.get(live_img, "live", self.model)
+            if original_cached is not None and live_cached is not None:
+                # Both analyses are known; only the comparison needs a round trip
+                print("✅ LLM cache hit for both screenshots")
+                return original_cached, live_cached, self.compare_components_llm(original_cached, live_cached)
+        
+        print("🧠 LLM analyzing and comparing original and live screenshots...")
+        
+        original_url, original_scale = self._prepare_image(original_img, original_path)
+        live_url, live_scale = self._prepare_image(live_img, live_path)
+        
+        try:
+            response = self._create_completion(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": ANALYSIS_INSTRUCTIONS + COMBINED_INSTRUCTIONS},
+                    {
+                        "role": "user",
+                        "content": [
+                            {"type": "text", "text": "Analyze and compare these two screenshots: ORIGINAL first, then LIVE."},
+                            {"type": "image_url", "image_url": {"url": original_url}},
+                            {"type": "image_url", "image_url": {"url": live_url}}
+                        ]
+                    }
+                ],
+                # The budgets of the two analysis calls and the comparison call it replaces
+                max_tokens=2000 + 2000 + 1500,
+                temperature=0.1
+            )
+            
+            result = self._parse_comparison_response(response.choices[0].message.content, ("original", "live"))
+            if "error" in result or not isinstance(result.get("original"), list) or not isinstance(result.get("live"), list):
+                print(f"⚠️ Combined LLM analysis unusable: {result.get('error', 'missing component lists')}")
+                return None
+            
+            original_components = self._build_components(result["original"], original_scale)
+            live_components = self._build_components(result["live"], live_scale)
+            comparison = result.get("comparison")
             
-        except json.JSONDecodeError as e:
-            print(f"❌ Failed to parse JSON from LLM response: {e}")
+            if self.cache is not None and response.choices[0].finish_reason == "stop":
+                if original_components:
+                    self.cache.set(original_img, "original", self.model, original_components)
+                if live_components:
+                    self.cache.set(live_img, "live", self.model, live_components)
+            
+            print(f"✅ LLM detected {len(original_components)} original and {len(live_components)} live components")
+            if not isinstance(comparison, dict) or not any(key in comparison for key, _ in LLM_ACCURACY_PENALTIES):
+                # An empty comparison would score as 100% accurate; compare the lists separately instead
+                print("⚠️ Combined LLM response had no usable comparison, comparing separately")
+                comparison = self.compare_components_llm(original_components, live_components)
+            return original_components, live_components, comparison
+            
+        except Exception as e:
+            print(f"⚠️ Combined LLM analysis failed: {e}")
+            return None
+    
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def _create_analysis_prompt(image_type: str) -> str:
+        """Create the per-image part of the analysis prompt (instructions live in ANALYSIS_INSTRUCTIONS)"""
+        
+        return ANALYSIS_PROMPT_TEMPLATE.substitute(image_type=image_type)
+    
+    def _create_completion(self, **kwargs):
+        """chat.completions.create behind the shared rate limiter, retrying transient errors with jittered backoff
+        
+        The client is built with max_retries=0, so 429s, connection errors, timeouts
+        and 5xx responses are all retried here, behind the token bucket.
+        """
+        
+        for attempt in range(1, LLM_MAX_ATTEMPTS + 1):
+            _llm_request_slots.acquire()
+            try:
+                _llm_rate_limiter.acquire()
+                response = self.client.chat.completions.create(**kwargs)
+            except LLM_RETRYABLE_ERRORS as e:
+                _llm_request_slots.release()
+                error_name = type(e).__name__
+                if attempt == LLM_MAX_ATTEMPTS:
+                    raise
+            except BaseException:
+                _llm_request_slots.release()
+                raise
+            else:
+                if kwargs.get("stream"):
+                    # A streamed body is still in flight after create() returns the headers
+                    return SlotHeldStream(response)
+                _llm_request_slots.release()
+                self._record_usage(getattr(response, "usage", None))
+                return response
+            
+            delay = min(30.0, 2.0 * 2 ** (attempt - 1)) + random.uniform(0, 1)
+            print(f"⏳ LLM request failed ({error_name}), retrying in {delay:.1f}s ({attempt}/{LLM_MAX_ATTEMPTS - 1})")
+            time.sleep(delay)
+    
+    def _stream_usage_options(self) -> Dict[str, Any]:
+        """Ask streams to report usage, on SDKs that know the option (openai>=1.26)"""
+        return {"stream_options": {"include_usage": True}} if _supports_stream_options(type(self.client.chat.completions)) else {}
+    
+    def _record_usage(self, usage):
+        """Add a response's exact token counts to token_usage"""
+        if usage is None:
+            return
+        with self._usage_lock:
+            self.token_usage["input"] += usage.prompt_tokens or 0
+            self.token_usage["output"] += usage.completion_tokens or 0
+    
+    def _track_stream_usage(self, response, state: Dict[str, Any] = None):
+        """Pass stream chunks through, recording the usage carried by the final one
+        
+        The stream's finish_reason is stored in state, if given, so callers can
+        tell a complete answer ("stop") from a truncated one.
+        """
+        for chunk in response:
+            if getattr(chunk, "usage", None) is not None:
+                self._record_usage(chunk.usage)
+            if state is not None and chunk.choices and chunk.choices[0].finish_reason:
+                state["finish_reason"] = chunk.choices[0].finish_reason
+            yield chunk
+    
+    def _prepare_image(self, image: np.ndarray, image_path: str = None) -> Tuple[str, float]:
+        """Downscale a screenshot to max_image_side and encode it; returns (data URL, scale)"""
+        
+        height, width = image.shape[:2]
+        scale = min(1.0, self.max_image_side / max(height, width))
+        
+        # Already small enough and already JPEG/PNG on disk: send the file's own bytes
+        mime_type = ENCODED_IMAGE_MIME_TYPES.get(os.path.splitext(image_path)[1].lower()) if image_path else None
+        if mime_type and scale == 1.0:
+            try:
+                with open(image_path, "rb") as f:
+                    return f"data:{mime_type};base64,{base64.b64encode(f.read()).decode()}", scale
+            except OSError:
+                pass
+        
+        if scale < 1.0:
+            image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        
+        return f"data:image/jpeg;base64,{self._image_to_base64(image)}", scale
+    
+    def _image_to_base64(self, image: np.ndarray) -> str:
+        """Encode an OpenCV (BGR) image as base64 JPEG"""
+        
+        # OpenCV encodes BGR directly, so no colour conversion or PIL round trip;
+        # JPEG is several times smaller than PNG for screenshots
+        ok, buffer = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        if not ok:
+            raise ValueError("Failed to encode image as JPEG")
+        
+        return base64.b64encode(buffer).decode()
+    
+    def _parse_llm_response(self, response_text, scale: float = 1.0) -> List[LLMComponentMatch]:
+        """Parse LLM response (a string or streamed text chunks) into component matches, mapping bboxes from a downscaled image back by 1/scale"""
+        
+        if isinstance(response_text, str):
+            response_text = [response_text]
+        
+        components = []
+        found_array = False
+        
+        for comp in self._iter_json_array_items(response_text):
+            found_array = True
+            component = self._build_component(comp, scale)
+            if component is not None:
+                components.append(component)
+        
+        if not found_array:
+            print("❌ No valid JSON found in LLM response")
             
         return components
     
+    def _build_components(self, items: List[Any], scale: float = 1.0) -> List[LLMComponentMatch]:
+        """Build component matches from a parsed JSON array, skipping malformed entries"""
+        
+        components = [self._build_component(comp, scale) for comp in items if isinstance(comp, dict)]
+        return [component for component in components if component is not None]
+    
+    def _build_component(self, comp: Dict[str, Any], scale: float = 1.0) -> LLMComponentMatch:
+        """Build a component match from one parsed JSON object, or None if it is malformed"""
+        
+        try:
+            bbox = tuple(comp.get("bbox", [0, 0, 0, 0]))
+            if scale != 1.0:
+                bbox = tuple(int(round(float(v) / scale)) for v in bbox)
+            
+            return LLMComponentMatch(
+                component_type=comp.get("component_type", "unknown"),
+                description=comp.get("description", ""),
+                confidence=float(comp.get("confidence", 0.0)),
+                bbox=bbox,
+                functionality=comp.get("functionality", ""),
+                visual_attributes=comp.get("visual_attributes", {}),
+                accessibility_notes=comp.get("accessibility_notes", "")
+            )
+            
+        except Exception as e:
+            print(f"⚠️ Failed to parse component: {e}")
+            return None
+    
+    def _iter_json_array_items(self, chunks):
+        """Yield each element of the first JSON array in a text stream as soon as it is complete"""
+        
+        decoder = json.JSONDecoder()
+        buffer = ""
+        pos = -1  # Next element position once the opening '[' has been seen
+        
+        for chunk in chunks:
+            if not chunk:
+                continue
+            buffer += chunk
+            
+            if pos == -1:
+                start = buffer.find('[')
+                if start == -1:
+                    continue
+                pos = start + 1
+            elif '}' not in chunk and ']' not in chunk:
+                # An element can only complete on a closing bracket
+                continue
+            
+            while True:
+                while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                    pos += 1
+                if pos >= len(buffer) or buffer[pos] == ']':
+                    break
+                try:
+                    item, pos = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    break  # Element still incomplete; wait for more text
+                if isinstance(item, dict):
+                    yield item
+    
     def compare_components_llm(self, original_components: List[LLMComponentMatch], 
                               live_components: List[LLMComponentMatch]) -> Dict[str, Any]:
         """Use LLM to intelligently compare components between images"""
         
+        # Identical component lists (the usual regression-run case) need no model call
+        original_fp = self._components_fingerprint(original_components)
+        live_fp = self._components_fingerprint(live_components)
+        if original_fp == live_fp:
+            print("✅ Component lists identical, skipping LLM comparison")
+            return {
+                "missing_components": [],
+                "extra_components": [],
+                "modified_components": [],
+                "overall_assessment": "identical"
+            }
+        
+        with self._comparison_cache_lock:
+            cached = self._comparison_cache.get((original_fp, live_fp))
+            if cached is not None:
+                self._comparison_cache.move_to_end((original_fp, live_fp))
+        if cached is not None:
+            print("✅ LLM comparison cache hit")
+            return cached
+        
         print("🧠 LLM comparing components for anomalies...")
         
         # Create comparison prompt
         comparison_prompt = self._create_comparison_prompt(original_components, live_components)
         
         try:
-            response = self.client.chat.completions.create(
+            response = self._create_completion(
                 model="gpt-4o",
                 messages=[
+                    {"role": "system", "content": COMPARISON_INSTRUCTIONS},
                     {
                         "role": "user",
                         "content": comparison_prompt
@@ -195,6 +905,12 @@ Be precise with bounding box coordinates and comprehensive in your analysis.
             # Parse comparison results
             analysis = self._parse_comparison_response(response.choices[0].message.content)
             
+            if "error" not in analysis:
+                with self._comparison_cache_lock:
+                    self._comparison_cache[(original_fp, live_fp)] = analysis
+                    while len(self._comparison_cache) > self.comparison_cache_size:
+                        self._comparison_cache.popitem(last=False)
+            
             print("✅ LLM component comparison completed")
             return analysis
             
@@ -204,78 +920,59 @@ Be precise with bounding box coordinates and comprehensive in your analysis.
     
     def _create_comparison_prompt(self, original_components: List[LLMComponentMatch], 
                                  live_components: List[LLMComponentMatch]) -> str:
-        """Create prompt for LLM component comparison"""
-        
-        # Serialize components for LLM
-        original_summary = []
-        for comp in original_components:
-            original_summary.append({
-                "type": comp.component_type,
-                "description": comp.description,
-                "bbox": comp.bbox,
-                "functionality": comp.functionality
-            })
-        
-        live_summary = []
-        for comp in live_components:
-            live_summary.append({
-                "type": comp.component_type,
-                "description": comp.description,
-                "bbox": comp.bbox,
-                "functionality": comp.functionality
-            })
-        
-        return f"""
-Compare these two sets of UI components and identify anomalies:
-
-ORIGINAL COMPONENTS:
-{json.dumps(original_summary, indent=2)}
-
-LIVE COMPONENTS:
-{json.dumps(live_summary, indent=2)}
-
-Analyze and return a JSON response with:
-1. missing_components: Components in original but not in live
-2. extra_components: Components in live but not in original  
-3. modified_components: Components that exist in both but have changed
-4. position_changes: Components that moved significantly
-5. functionality_changes: Components with different behavior
-6. accessibility_issues: New accessibility problems
-7. overall_assessment: Summary of changes and their impact
-
-For each anomaly, provide:
-- component_type
-- description of the change
-- severity (low/medium/high)
-- recommendation for fixing
-
-Focus on:
-- Functional equivalence (same purpose, different implementation)
-- Layout preservation (components in similar positions)
-- User experience impact (missing critical features)
-- Accessibility compliance (proper labeling, contrast)
-
-Return as valid JSON.
-"""
+        """Create the per-call part of the comparison prompt (instructions live in COMPARISON_INSTRUCTIONS)"""
+        
+        # Serialize components for LLM; compact separators keep the prompt's token count down
+        return COMPARISON_PROMPT_TEMPLATE % (
+            self._summarize_components(original_components),
+            self._summarize_components(live_components)
+        )
+    
+    @staticmethod
+    def _comparison_fields(component: LLMComponentMatch) -> Dict[str, Any]:
+        """The fields of a component that the comparison prompt sends"""
+        return {
+            "type": component.component_type,
+            "description": component.description,
+            "bbox": component.bbox,
+            "functionality": component.functionality
+        }
     
-    def _parse_comparison_response(self, response_text: str) -> Dict[str, Any]:
-        """Parse LLM comparison response"""
+    @classmethod
+    def _components_fingerprint(cls, components: List[LLMComponentMatch]) -> str:
+        """Order-independent digest of everything the comparison prompt would see"""
+        canonical = sorted(dumps_json(cls._comparison_fields(c)) for c in components)
+        return hashlib.blake2b("\n".join(canonical).encode("utf-8"), digest_size=16).hexdigest()
+    
+    @classmethod
+    def _summarize_components(cls, components: List[LLMComponentMatch]) -> str:
+        """Compact JSON of the fields the comparison needs"""
+        return dumps_json([cls._comparison_fields(c) for c in components])
+    
+    def _parse_comparison_response(self, response_text: str, required_keys: Tuple[str, ...] = None) -> Dict[str, Any]:
+        """Parse LLM comparison response
         
-        try:
-            # Extract JSON from response
-            start_idx = response_text.find('{')
-            end_idx = response_text.rfind('}') + 1
-            
-            if start_idx == -1 or end_idx == 0:
-                return {"error": "No valid JSON in response"}
-            
-            json_str = response_text[start_idx:end_idx]
-            analysis = json.loads(json_str)
-            
-            return analysis
-            
-        except json.JSONDecodeError as e:
-            return {"error": f"Failed to parse JSON: {e}"}
+        Only an object with at least one of required_keys (by default the anomaly
+        lists) counts, so a stray fragment can never pass for an empty comparison.
+        """
+        
+        if required_keys is None:
+            required_keys = tuple(key for key, _ in LLM_ACCURACY_PENALTIES)
+        
+        # Extract JSON from response: the first balanced object that parses
+        error = None
+        for json_str in iter_json_blocks(response_text, "{"):
+            try:
+                analysis = loads_json(json_str)
+            except json.JSONDecodeError as e:
+                error = error or e
+                continue
+            if isinstance(analysis, dict) and any(key in analysis for key in required_keys):
+                return analysis
+        
+        if error is not None:
+            return {"error": f"Failed to parse JSON: {error}"}
+        return {"error": "No valid JSON in response"}
     
     def _fallback_comparison(self, original_components: List[LLMComponentMatch], 
                             live_components: List[LLMComponentMatch]) -> Dict[str, Any]:
@@ -297,48 +994,17 @@ Return as valid JSON.
         
         print("📝 Generating LLM-powered analysis report...")
         
-        report_prompt = f"""
-Generate a comprehensive UI component analysis report based on this data:
-
-COMPONENT ANALYSIS:
-- Original components: {len(components_original)}
-- Live components: {len(components_live)}
-
-COMPARISON RESULTS:
-{json.dumps(comparison_result, indent=2)}
-
-Create a professional report with:
-
-1. EXECUTIVE SUMMARY
-   - Overall accuracy assessment
-   - Key findings and impact
-   
-2. COMPONENT BREAKDOWN
-   - Missing functionality
-   - Added features
-   - Modified elements
-   
-3. USER EXPERIENCE IMPACT
-   - Critical issues affecting usability
-   - Accessibility concerns
-   - Performance implications
-   
-4. RECOMMENDATIONS
-   - Priority fixes
-   - Enhancement opportunities
-   - Best practices
-
-5. TECHNICAL DETAILS
-   - Specific component changes
-   - Implementation notes
-
-Format as markdown with clear sections and actionable insights.
-"""
+        report_prompt = REPORT_PROMPT_TEMPLATE % (
+            len(components_original),
+            len(components_live),
+            dumps_json(comparison_result, indent=True)
+        )
         
         try:
-            response = self.client.chat.completions.create(
+            response = self._create_completion(
                 model="gpt-4o",
                 messages=[
+                    {"role": "system", "content": REPORT_INSTRUCTIONS},
                     {
                         "role": "user",
                         "content": report_prompt
@@ -353,6 +1019,13 @@ Format as markdown with clear sections and actionable insights.
         except Exception as e:
             return f"# Component Analysis Report\n\nError generating report: {e}"
 
+# Accuracy penalty per reported anomaly (simple scoring - can be enhanced)
+LLM_ACCURACY_PENALTIES = (
+    ("missing_components", 10),
+    ("extra_components", 5),
+    ("modified_components", 7),
+)
+
 class LLMEnhancedAccuracyValidator:
     """Enhanced AccuracyValidator using LLM component detection"""
     
@@ -360,18 +1033,30 @@ class LLMEnhancedAccuracyValidator:
         self.llm_detector = LLMComponentDetector()
         self.traditional_detector = None  # Keep traditional as fallback
         
-    def analyze_with_llm(self, original_img: np.ndarray, live_img: np.ndarray) -> Dict[str, Any]:
-        """Comprehensive analysis using LLM"""
+    def analyze_with_llm(self, original_img: np.ndarray, live_img: np.ndarray,
+                         original_path: str = None, live_path: str = None) -> Dict[str, Any]:
+        """Comprehensive analysis using LLM (paths are the files the images were read from, if any)"""
         
         print("🧠 Starting LLM-enhanced component analysis...")
+        usage_before = dict(self.llm_detector.token_usage)
         
         try:
-            # Analyze both images with LLM
-            original_components = self.llm_detector.analyze_components(original_img, "original")
-            live_components = self.llm_detector.analyze_components(live_img, "live")
+            # One multi-image call analyzes and compares both screenshots
+            combined = self.llm_detector.analyze_and_compare(original_img, live_img, original_path, live_path)
             
-            # LLM-powered comparison
-            comparison_result = self.llm_detector.compare_components_llm(original_components, live_components)
+            if combined is not None:
+                original_components, live_components, comparison_result = combined
+            else:
+                # Fallback: the two vision calls are independent and network-bound,
+                # so they run side by side instead of back to back
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    original_future = executor.submit(self.llm_detector.analyze_components, original_img, "original", original_path)
+                    live_future = executor.submit(self.llm_detector.analyze_components, live_img, "live", live_path)
+                    original_components = original_future.result()
+                    live_components = live_future.result()
+                
+                # LLM-powered comparison
+                comparison_result = self.llm_detector.compare_components_llm(original_components, live_components)
             
             # Generate detailed report
             report = self.llm_detector.generate_llm_report(original_components, live_components, comparison_result)
@@ -386,7 +1071,10 @@ class LLMEnhancedAccuracyValidator:
                 "component_accuracy": float(component_accuracy) if component_accuracy else 0.0,
                 "detailed_report": report or "LLM analysis completed with limited data",
                 "analysis_method": "LLM-powered",
-                "model_used": self.llm_detector.model
+                "model_used": self.llm_detector.model,
+                "token_usage": {
+                    key: self.llm_detector.token_usage[key] - usage_before[key] for key in usage_before
+                }
             }
             
         except Exception as e:
@@ -412,21 +1100,13 @@ class LLMEnhancedAccuracyValidator:
         """Calculate accuracy score from LLM analysis"""
         
         try:
-            missing = len(comparison_result.get("missing_components", []))
-            extra = len(comparison_result.get("extra_components", []))
-            modified = len(comparison_result.get("modified_components", []))
-            
-            # Simple scoring - can be enhanced
-            total_issues = missing + extra + modified
-            
-            if total_issues == 0:
-                return 100.0
-            
             # Penalize missing components more than extra ones
-            penalty = (missing * 10) + (extra * 5) + (modified * 7)
-            accuracy = max(0, 100 - penalty)
+            penalty = sum(
+                len(comparison_result.get(key, ())) * weight
+                for key, weight in LLM_ACCURACY_PENALTIES
+            )
             
-            return float(accuracy)
+            return float(max(0, 100 - penalty))
             
         except Exception:
             return 0.0